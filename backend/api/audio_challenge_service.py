@@ -3,98 +3,358 @@ Audio Challenge Service - TTS-based pronunciation challenges
 Handles audio generation and challenge creation for pronunciation quizzes
 """
 
-import traceback
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Set
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from api.audio_responses import (
+    AUDIO_CACHE_CONTROL,
+    audio_response,
+    etag_matches,
+    file_info,
+    not_modified_response,
+)
+from domain.audio_challenge_logic import (
+    BUNDLE_MODES,
+    bundle_challenge_audio,
+    generate_audio_challenge,
+    generate_audio_challenges,
+)
+from domain.challenge_pool import pop_pooled_challenge
+from infrastructure.audio_cache import (
+    CHALLENGE_CACHE_TTL_SECONDS,
+    get_cached_audio,
+    get_cached_audio_path,
+    get_cached_challenge,
+)
+from infrastructure.audio_processing import QUALITIES, select_encodings
+from infrastructure.challenge_tokens import verify_challenge_token
+from infrastructure.metrics import CallbackMetric, Counter, register
+from infrastructure.tts_backends import MEDIA_TYPE_EXTENSIONS, sniff_media_type
+
+logger = logging.getLogger(__name__)
 
-from fastapi import APIRouter, HTTPException, Response
-from pydantic import BaseModel
+router = APIRouter()
 
-from domain.audio_challenge_logic import generate_audio_challenge
-from infrastructure.audio_cache import get_cached_audio, get_cached_challenge
+# Worker threads that run blocking challenge generation off the event loop
+GENERATION_WORKERS = int(os.environ.get("GENERATION_WORKERS", "4"))
+# Generations allowed to run or wait for a worker before new ones are rejected
+GENERATION_QUEUE_LIMIT = int(os.environ.get("GENERATION_QUEUE_LIMIT", "16"))
+# Seconds a rejected client is told to wait before retrying
+GENERATION_RETRY_AFTER = int(os.environ.get("GENERATION_RETRY_AFTER", "2"))
+
+_generation_executor = ThreadPoolExecutor(
+    max_workers=GENERATION_WORKERS, thread_name_prefix="challenge-gen"
+)
+# Incremented on the event loop, decremented by the worker finishing the job
+_generations_in_flight = 0
+_generations_lock = threading.Lock()
+
+register(
+    CallbackMetric(
+        "challenge_generations_in_flight",
+        "Challenge generations running or waiting for a worker",
+        "gauge",
+        lambda: {(): _generations_in_flight},
+    )
+)
+GENERATIONS_REJECTED = register(
+    Counter(
+        "challenge_generations_rejected_total",
+        "Generation requests rejected with 503 because the queue was full",
+    )
+)
+
+
+async def run_generation(func, *args):
+    """
+    Run a blocking generation function on the bounded generation executor.
+
+    Raises:
+        HTTPException: 503 with Retry-After when GENERATION_QUEUE_LIMIT
+            generations are already running or queued
+    """
+    global _generations_in_flight  # pylint: disable=global-statement
+
+    with _generations_lock:
+        admitted = _generations_in_flight < GENERATION_QUEUE_LIMIT
+        if admitted:
+            _generations_in_flight += 1
+    if not admitted:
+        GENERATIONS_REJECTED.inc()
+        raise HTTPException(
+            status_code=503,
+            detail="Challenge generation is busy, please retry shortly",
+            headers={"Retry-After": str(GENERATION_RETRY_AFTER)},
+        )
+
+    try:
+        future = _generation_executor.submit(func, *args)
+    except RuntimeError:
+        _release_generation_slot(None)
+        raise
+    # The slot is freed when the job ends, not when the await does: a
+    # cancelled request (client disconnect) cannot stop a started job
+    future.add_done_callback(_release_generation_slot)
+    return await asyncio.wrap_future(future)
 
-router = APIRouter()
+
+def _release_generation_slot(_future) -> None:
+    global _generations_in_flight  # pylint: disable=global-statement
+
+    with _generations_lock:
+        _generations_in_flight -= 1
 
 
 class CreateAudioChallengeRequest(BaseModel):
     """Request model for creating audio challenges."""
     difficulty: str = "medium"  # easy, medium, hard
+    bundle: Optional[str] = None  # None, "inline" or "sprite" to embed the audio
+
+
+class CreateAudioChallengeBatchRequest(BaseModel):
+    """Request model for generating several audio challenges at once."""
+    difficulty: str = "medium"  # easy, medium, hard
+    count: int = Field(default=10, ge=1, le=50)
+    exclude_words: List[str] = []  # words already seen in the session
+    bundle: Optional[str] = None  # None, "inline" or "sprite" to embed the audio
+
+
+def _validate_challenge_request(difficulty: str, bundle: Optional[str]) -> None:
+    """Reject unknown difficulty levels and bundle modes with a 400."""
+    if difficulty not in ["easy", "medium", "hard"]:
+        raise HTTPException(
+            status_code=400, detail="Difficulty must be 'easy', 'medium', or 'hard'"
+        )
+    if bundle is not None and bundle not in BUNDLE_MODES:
+        raise HTTPException(
+            status_code=400, detail="Bundle must be 'inline' or 'sprite'"
+        )
+
+
+def _pop_pooled_challenges(
+    difficulty: str, count: int, seen_words: Set[str]
+) -> List[Dict]:
+    """
+    Take up to count pooled challenges whose words are not in seen_words.
+
+    Pooled challenges are checked against the cache store, so this blocks;
+    run it off the event loop. Words taken are added to seen_words.
+    """
+    challenges = []
+    while len(challenges) < count:
+        pooled = pop_pooled_challenge(difficulty)
+        if pooled is None:
+            break
+        if pooled["word"] not in seen_words:
+            challenges.append(pooled)
+            seen_words.add(pooled["word"])
+    return challenges
 
 
 class SubmitAudioAnswerRequest(BaseModel):
     """Request model for submitting audio challenge answers."""
     user_answer: str  # A, B, C, or D
     user_id: int
+    token: Optional[str] = None  # signed challenge token, if issued
 
 
 @router.post("/challenge/audio/generate")
 async def generate_audio_quiz(request: CreateAudioChallengeRequest):
     """
     Generate a new audio-based pronunciation challenge
-    Returns challenge with audio data for each option
+    Returns challenge with audio URLs for each option, or the audio itself
+    when a bundle mode is requested
     """
     try:
-        # Validate difficulty
-        if request.difficulty not in ["easy", "medium", "hard"]:
-            raise HTTPException(
-                status_code=400, detail="Difficulty must be 'easy', 'medium', or 'hard'"
-            )
+        # Validate difficulty and bundle mode
+        _validate_challenge_request(request.difficulty, request.bundle)
 
-        print(f"Generating audio challenge for difficulty: {request.difficulty}")
+        logger.debug("Generating audio challenge", extra={"difficulty": request.difficulty})
 
-        # Generate challenge with audio (from domain.audio_challenge_logic)
-        challenge_data = generate_audio_challenge(request.difficulty)
+        # Take a pre-generated challenge if the warm pool has one,
+        # otherwise generate it with audio (from domain.audio_challenge_logic)
+        challenge_data = await asyncio.to_thread(
+            pop_pooled_challenge, request.difficulty
+        )
+        if challenge_data is None:
+            challenge_data = await run_generation(
+                generate_audio_challenge, request.difficulty
+            )
 
-        print("Challenge generated successfully")
-        print(f"Challenge ID: {challenge_data['id']}")
-        print(f"Word: {challenge_data['word']}")
-        print(f"Correct Answer: {challenge_data['correct_answer']}")
-        print(f"Options: {[opt['letter'] for opt in challenge_data['options']]}")
+        logger.debug(
+            "Challenge generated",
+            extra={
+                "challenge_id": challenge_data["id"],
+                "word": challenge_data["word"],
+                "correct_answer": challenge_data["correct_answer"],
+            },
+        )
+
+        if request.bundle is not None:
+            challenge_data = await asyncio.to_thread(
+                bundle_challenge_audio, challenge_data, request.bundle
+            )
 
         return challenge_data
 
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"API ERROR: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error generating audio challenge")
         raise HTTPException(
             status_code=500, detail=f"Error generating audio challenge: {str(e)}"
         ) from e
 
 
+@router.post("/challenge/audio/generate/batch")
+async def generate_audio_quiz_batch(request: CreateAudioChallengeBatchRequest):
+    """
+    Generate several audio challenges with distinct words in one request
+    Lets the app prefetch a whole quiz session in a single round trip
+    """
+    try:
+        _validate_challenge_request(request.difficulty, request.bundle)
+
+        logger.debug(
+            "Generating audio challenge batch",
+            extra={"difficulty": request.difficulty, "count": request.count},
+        )
+
+        # Use pre-generated challenges first, then generate the rest in one batch
+        seen_words = set(request.exclude_words)
+        challenges = await asyncio.to_thread(
+            _pop_pooled_challenges, request.difficulty, request.count, seen_words
+        )
+
+        remaining = request.count - len(challenges)
+        if remaining > 0:
+            try:
+                challenges += await run_generation(
+                    generate_audio_challenges, request.difficulty, remaining, seen_words
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e)) from e
+
+        if request.bundle is not None:
+            challenges = await asyncio.to_thread(
+                lambda: [bundle_challenge_audio(c, request.bundle) for c in challenges]
+            )
+
+        return {
+            "difficulty": request.difficulty,
+            "count": len(challenges),
+            "expires_in": int(CHALLENGE_CACHE_TTL_SECONDS),
+            "challenges": challenges,
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error generating audio challenge batch")
+        raise HTTPException(
+            status_code=500, detail=f"Error generating audio challenges: {str(e)}"
+        ) from e
+
+
 @router.get("/challenge/audio/{challenge_id}/option/{option_letter}")
-async def get_audio_option(challenge_id: int, option_letter: str):
+async def get_audio_option(
+    challenge_id: int,
+    option_letter: str,
+    request: Request,
+    quality: Optional[str] = Query(None, pattern=f"^({'|'.join(QUALITIES)})$"),
+):
     """
     Get audio file for a specific option
-    Returns MP3 audio file
+    Returns the trimmed, loudness-normalized clip: MP3 by default, compact
+    MP3 or Opus for ?quality=compact (or a "Save-Data: on" header), and the
+    clip exactly as the TTS backend produced it for ?quality=original or
+    when the server has no ffmpeg. Opus is only sent to clients whose
+    Accept header names audio/ogg.
+
+    Supports single byte ranges (206), and If-None-Match revalidation (304)
+    against a strong ETag derived from the clip content.
     """
+    encodings = select_encodings(
+        quality, request.headers.get("accept"), request.headers.get("save-data")
+    )
+    # The clip served depends on these headers as well as the URL
+    vary = {"Vary": "Accept, Save-Data"}
+
     try:
-        print(f"Retrieving audio: Challenge {challenge_id}, Option {option_letter}")
+
+        # Serve straight from the persistent audio store when possible
+        audio_path = await asyncio.to_thread(
+            get_cached_audio_path, challenge_id, option_letter, encodings
+        )
+        if audio_path is not None:
+            # Hashing reads the file on first use, so keep it off the event loop
+            etag, media_type = await asyncio.to_thread(file_info, audio_path)
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                response = not_modified_response(etag)
+                response.headers.update(vary)
+                return response
+
+            extension = MEDIA_TYPE_EXTENSIONS.get(media_type, "mp3")
+
+            logger.debug(
+                "Serving audio from store",
+                extra={"challenge_id": challenge_id, "option": option_letter},
+            )
+
+            # FileResponse handles Range / If-Range against the ETag given here
+            return FileResponse(
+                audio_path,
+                media_type=media_type,
+                content_disposition_type="inline",
+                filename=f"option_{option_letter}.{extension}",
+                headers={"Cache-Control": AUDIO_CACHE_CONTROL, "ETag": etag, **vary},
+            )
 
         # Retrieve cached audio from infrastructure.audio_cache
-        audio_data = get_cached_audio(challenge_id, option_letter)
+        audio_data = await asyncio.to_thread(
+            get_cached_audio, challenge_id, option_letter, encodings
+        )
 
         if audio_data is None:
-            print("Audio not found in cache")
+            logger.debug(
+                "Audio not found",
+                extra={"challenge_id": challenge_id, "option": option_letter},
+            )
             raise HTTPException(
                 status_code=404,
                 detail=f"Audio not found for challenge {challenge_id}, option {option_letter}",
             )
 
-        print(f"Serving audio: {len(audio_data)} bytes")
-
-        return Response(
-            content=audio_data,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": f"inline; filename=option_{option_letter}.mp3",
-                "Accept-Ranges": "bytes",
-                "Cache-Control": "public, max-age=3600",
+        logger.debug(
+            "Serving audio from cache",
+            extra={
+                "challenge_id": challenge_id,
+                "option": option_letter,
+                "bytes": len(audio_data),
             },
         )
 
+        media_type = sniff_media_type(audio_data)
+        extension = MEDIA_TYPE_EXTENSIONS.get(media_type, "mp3")
+
+        response = audio_response(
+            request, audio_data, media_type, f"option_{option_letter}.{extension}"
+        )
+        response.headers.update(vary)
+        return response
+
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error retrieving audio: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error retrieving audio")
         raise HTTPException(status_code=500, detail=f"Error retrieving audio: {str(e)}") from e
 
 
@@ -102,22 +362,29 @@ async def get_audio_option(challenge_id: int, option_letter: str):
 async def submit_audio_answer(challenge_id: int, request: SubmitAudioAnswerRequest):
     """
     Submit answer for audio challenge
+
+    With a signed challenge token the answer is graded from the token alone,
+    so any worker can handle the submission; otherwise the challenge is
+    looked up in the cache.
     """
     try:
-        print(f"Submitting answer for challenge {challenge_id}")
-        print(f"User answer: {request.user_answer}")
-
-        # Get challenge from infrastructure.audio_cache
-        challenge = get_cached_challenge(challenge_id)
+        if request.token is not None:
+            # Stateless grading from infrastructure.challenge_tokens
+            challenge = verify_challenge_token(request.token)
+            if challenge is None or challenge["id"] != challenge_id:
+                raise HTTPException(
+                    status_code=400, detail="Invalid or expired challenge token"
+                )
+        else:
+            # Get challenge from infrastructure.audio_cache
+            challenge = await asyncio.to_thread(get_cached_challenge, challenge_id)
 
         if challenge is None:
-            print("Challenge not found in cache")
+            logger.debug("Challenge not found", extra={"challenge_id": challenge_id})
             raise HTTPException(
                 status_code=404, detail=f"Challenge {challenge_id} not found"
             )
 
-        print(f"Correct answer: {challenge['correct_answer']}")
-
         # Check answer
         is_correct = request.user_answer.upper() == challenge["correct_answer"].upper()
 
@@ -131,8 +398,16 @@ async def submit_audio_answer(challenge_id: int, request: SubmitAudioAnswerReque
             "Correct! Great job!" if is_correct else "Incorrect. Try again!"
         )
 
-        print(f"Result: {'CORRECT' if is_correct else 'INCORRECT'}")
-        print(f"XP Earned: {xp_earned}")
+        logger.debug(
+            "Answer graded",
+            extra={
+                "challenge_id": challenge_id,
+                "user_answer": request.user_answer,
+                "correct_answer": challenge["correct_answer"],
+                "is_correct": is_correct,
+                "xp_earned": xp_earned,
+            },
+        )
 
         # Note: Progress data is now saved directly by the frontend
         # Backend only handles quiz validation and audio logic
@@ -151,8 +426,7 @@ async def submit_audio_answer(challenge_id: int, request: SubmitAudioAnswerReque
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error submitting answer: {str(e)}")
-        traceback.print_exc()
+        logger.exception("Error submitting answer")
         raise HTTPException(
             status_code=500, detail=f"Error submitting answer: {str(e)}"
         ) from e
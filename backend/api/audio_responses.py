@@ -0,0 +1,176 @@
+"""
+Audio Responses - HTTP caching and byte-range helpers for audio clips
+
+Implements strong ETags derived from the clip content, If-None-Match -> 304
+revalidation and single byte-range (206) responses for clips held in memory.
+Clips served from the disk store use FileResponse, which handles Range and
+If-Range itself; they get the same content-derived ETag, computed by
+file_info off the event loop.
+"""
+
+import hashlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from infrastructure.tts_backends import sniff_media_type
+
+AUDIO_CACHE_CONTROL = "public, max-age=3600"
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header lies entirely outside the clip."""
+
+
+def audio_etag(audio: bytes) -> str:
+    """Strong ETag for a clip, derived from its bytes."""
+    return f'"{hashlib.blake2b(audio, digest_size=16).hexdigest()}"'
+
+
+@lru_cache(maxsize=4096)
+def _file_info(path: str, mtime_ns: int, size: int) -> Tuple[str, str]:
+    # mtime and size are part of the cache key so a replaced file is re-read
+    del mtime_ns, size
+    with open(path, "rb") as f:
+        audio = f.read()
+    return audio_etag(audio), sniff_media_type(audio)
+
+
+def file_info(path: Path) -> Tuple[str, str]:
+    """
+    ETag and media type of a stored clip; each file is read only once.
+
+    Blocking file I/O: call it off the event loop.
+
+    Returns:
+        (strong ETag, media type sniffed from the clip)
+    """
+    stat_result = path.stat()
+    return _file_info(str(path), stat_result.st_mtime_ns, stat_result.st_size)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against an ETag.
+
+    Uses weak comparison as required for If-None-Match (RFC 9110 13.1.2).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def _opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(_opaque(tag) == _opaque(etag) for tag in if_none_match.split(","))
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Args:
+        range_header: Value of the Range header
+        size: Length of the clip in bytes
+
+    Returns:
+        Inclusive (start, end) byte positions, or None when the whole clip
+        should be sent (no header, unsupported unit, malformed or multi-range)
+
+    Raises:
+        RangeNotSatisfiable: If the range starts beyond the end of the clip
+    """
+    if not range_header:
+        return None
+
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    start_text, sep, end_text = spec.strip().partition("-")
+    if not sep:
+        return None
+
+    try:
+        if start_text == "":
+            # Suffix range: the last N bytes
+            suffix_length = int(end_text)
+            if suffix_length <= 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - suffix_length), size - 1
+
+        start = int(start_text)
+        end = int(end_text) if end_text else size - 1
+    except ValueError:
+        return None
+
+    if start >= size:
+        raise RangeNotSatisfiable()
+    if start > end:
+        return None
+    return start, min(end, size - 1)
+
+
+def not_modified_response(etag: str) -> Response:
+    """304 response confirming the client's copy is current."""
+    return Response(
+        status_code=304, headers={"ETag": etag, "Cache-Control": AUDIO_CACHE_CONTROL}
+    )
+
+
+def audio_response(
+    request: Request, audio: bytes, media_type: str, filename: str
+) -> Response:
+    """
+    Build the response for an in-memory clip.
+
+    Honours If-None-Match, Range and If-Range.
+
+    Args:
+        request: Incoming request (If-None-Match, Range and If-Range are read)
+        audio: Clip bytes
+        media_type: Content type of the clip
+        filename: Filename suggested in Content-Disposition
+
+    Returns:
+        200 with the whole clip, 206 with the requested range, 304 if the
+        client's ETag matches, or 416 if the range cannot be satisfied
+    """
+    etag = audio_etag(audio)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+
+    headers: Dict[str, str] = {
+        "Content-Disposition": f"inline; filename={filename}",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": AUDIO_CACHE_CONTROL,
+        "ETag": etag,
+    }
+
+    # A stale If-Range validator means the client must get the full clip
+    if_range = request.headers.get("if-range")
+    range_header = request.headers.get("range")
+    if if_range is not None and if_range.strip() != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, len(audio))
+    except RangeNotSatisfiable:
+        headers["Content-Range"] = f"bytes */{len(audio)}"
+        return Response(status_code=416, headers=headers)
+
+    if byte_range is None:
+        return Response(content=audio, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{len(audio)}"
+    return Response(
+        content=audio[start : end + 1],
+        status_code=206,
+        media_type=media_type,
+        headers=headers,
+    )
@@ -0,0 +1,315 @@
+"""
+Pipeline Benchmarks - Microbenchmarks for the challenge generation pipeline
+
+Times word selection, variant generation, each mispronunciation technique,
+option scrambling, cache operations and full challenge generation with the
+stub TTS engine, so results measure our code rather than the network.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline                  # run and compare
+    python -m benchmarks.bench_pipeline --save-baseline  # record a baseline
+    python -m benchmarks.bench_pipeline --filter cache --output results.json
+
+Results are written as JSON. When a baseline file exists, every benchmark
+is compared against it by median time per call and regressions beyond
+--threshold are reported (exit status 1 with --fail-on-regression).
+Baselines are machine-specific: record one on the machine you compare on.
+"""
+
+import os
+
+# Benchmark our code, not the network; respect an explicit choice otherwise
+os.environ.setdefault("TTS_BACKEND", "stub")
+# Stub clips are not decodable audio, so skip the ffmpeg stage
+os.environ.setdefault("AUDIO_PROCESSING", "off")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# pylint: disable=wrong-import-position
+import argparse
+import itertools
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from domain.audio_challenge_logic import (
+    add_aspirated_vowel,
+    create_pronunciation_variants,
+    create_pronunciation_variants_batch,
+    elongate_vowel,
+    generate_audio_challenge,
+    replace_vowel_with_similar,
+    synthesize_variants,
+)
+from domain.utils.word_picker import get_word_by_difficulty, get_word_index
+from domain.utils.word_scrambler import generate_scrambled_options
+from infrastructure.audio_cache import (
+    cache_synthesized_audio,
+    get_synthesized_audio,
+    synthesis_key,
+)
+from infrastructure.logging_config import configure_logging
+from infrastructure.tts_backends import get_tts_backend
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+SAMPLE_WORDS = ["pronunciation", "destiny", "banana", "communication", "rhythm"]
+
+Benchmark = Tuple[str, Callable[[], object]]
+
+
+def _cycle(values: List) -> Callable[[], object]:
+    """Return a function yielding the next value on every call."""
+    return itertools.cycle(values).__next__
+
+
+def build_benchmarks() -> List[Benchmark]:
+    """Create (name, zero-argument callable) pairs for every benchmark."""
+    benchmarks: List[Benchmark] = []
+    next_word = _cycle(SAMPLE_WORDS)
+
+    for difficulty in ("easy", "medium", "hard"):
+        benchmarks.append(
+            (
+                f"get_word_by_difficulty[{difficulty}]",
+                lambda d=difficulty: get_word_by_difficulty(d),
+            )
+        )
+
+    benchmarks.append(
+        (
+            "create_pronunciation_variants",
+            lambda: create_pronunciation_variants(next_word()),
+        )
+    )
+    # Per-call cost for 100 words: scalar loop vs. batch API
+    batch_words = [SAMPLE_WORDS[i % len(SAMPLE_WORDS)] for i in range(100)]
+    benchmarks.append(
+        (
+            "create_pronunciation_variants[100 words]",
+            lambda: [create_pronunciation_variants(w) for w in batch_words],
+        )
+    )
+    benchmarks.append(
+        (
+            "create_pronunciation_variants_batch[100 words]",
+            lambda: create_pronunciation_variants_batch(batch_words),
+        )
+    )
+    for technique in (elongate_vowel, replace_vowel_with_similar, add_aspirated_vowel):
+        benchmarks.append(
+            (f"technique[{technique.__name__}]", lambda t=technique: t(next_word()))
+        )
+    benchmarks.append(
+        ("generate_scrambled_options", lambda: generate_scrambled_options(next_word()))
+    )
+
+    # Cache operations over a working set that fits in the default budget
+    audio = get_tts_backend().synthesize("benchmark")
+    keys = [synthesis_key(f"bench-{i}", "en", False, "bench") for i in range(1024)]
+    for key in keys:
+        cache_synthesized_audio(key, audio)
+    next_key = _cycle(keys)
+    benchmarks.append(("cache_put", lambda: cache_synthesized_audio(next_key(), audio)))
+    benchmarks.append(("cache_get", lambda: get_synthesized_audio(next_key())))
+
+    # Cold synthesis: unique texts, so every call reaches the TTS backend
+    counter = itertools.count()
+
+    def _cold_synthesis():
+        n = next(counter)
+        variants = [
+            {"spoken_text": f"cold {n} {i}", "pattern": "correct"} for i in range(4)
+        ]
+        return synthesize_variants(variants)
+
+    benchmarks.append(("synthesize_variants[cold]", _cold_synthesis))
+
+    for difficulty in ("easy", "medium", "hard"):
+        benchmarks.append(
+            (
+                f"generate_audio_challenge[{difficulty}]",
+                lambda d=difficulty: generate_audio_challenge(d),
+            )
+        )
+
+    return benchmarks
+
+
+def measure(
+    func: Callable[[], object], repeat: int = 5, min_time: float = 0.2
+) -> Dict[str, float]:
+    """
+    Time a callable like timeit: calibrate a loop count, then take samples.
+
+    Args:
+        func: Zero-argument function to time
+        repeat: Number of samples
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Per-call timings in microseconds (min, median, mean, stdev), the
+        loop count per sample and calls per second at the median
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        loops *= 2
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops * 1e6)
+
+    median = statistics.median(samples)
+    return {
+        "min_us": round(min(samples), 3),
+        "median_us": round(median, 3),
+        "mean_us": round(statistics.fmean(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "loops": loops,
+        "ops_per_sec": round(1e6 / median, 1) if median else 0.0,
+    }
+
+
+def run(
+    name_filter: Optional[str] = None, repeat: int = 5, min_time: float = 0.2
+) -> Dict:
+    """
+    Run the suite
+
+    Args:
+        name_filter: Only run benchmarks whose name contains this string
+        repeat: Samples per benchmark
+        min_time: Minimum duration of one sample in seconds
+
+    Returns:
+        Results document (metadata and per-benchmark timings)
+    """
+    word_count = len(get_word_index())
+    results = {}
+    for name, func in build_benchmarks():
+        if name_filter and name_filter not in name:
+            continue
+        random.seed(1234)
+        results[name] = measure(func, repeat=repeat, min_time=min_time)
+        print(f"{name:45s} {results[name]['median_us']:>12.2f} us/call")
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "tts_backend": get_tts_backend().name,
+            "word_index_size": word_count,
+        },
+        "results": results,
+    }
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Print a comparison of median times against a baseline
+
+    Args:
+        current: Results document from run()
+        baseline: Results document previously saved
+        threshold: Relative slowdown that counts as a regression (0.1 = 10%)
+
+    Returns:
+        Names of the benchmarks that regressed
+    """
+    regressions = []
+    print(f"\n{'benchmark':45s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if base is None or not base.get("median_us"):
+            print(f"{name:45s} {'-':>12s} {result['median_us']:>12.2f} {'new':>8s}")
+            continue
+
+        change = result["median_us"] / base["median_us"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(
+            f"{name:45s} {base['median_us']:>12.2f} {result['median_us']:>12.2f}"
+            f" {change:>+7.1%}{flag}"
+        )
+
+    if baseline.get("meta", {}).get("platform") != current["meta"]["platform"]:
+        print("\nWarning: baseline was recorded on a different platform")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the challenge pipeline")
+    parser.add_argument("--filter", help="only run benchmarks containing this string")
+    parser.add_argument("--repeat", type=int, default=5, help="samples per benchmark")
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="minimum seconds per sample"
+    )
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="baseline JSON file"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store these results as the baseline",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as a regression (default 0.10)",
+    )
+    parser.add_argument(
+        "--fail-on-regression",
+        action="store_true",
+        help="exit with status 1 when a benchmark regressed",
+    )
+    args = parser.parse_args()
+
+    configure_logging()
+    current = run(args.filter, args.repeat, args.min_time)
+
+    if args.output:
+        args.output.write_text(json.dumps(current, indent=2))
+        print(f"\nWrote results to {args.output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(current, indent=2))
+        print(f"\nSaved baseline to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(
+            f"\nNo baseline at {args.baseline}; run with --save-baseline to record one"
+        )
+        return 0
+
+    regressions = compare(
+        current, json.loads(args.baseline.read_text()), args.threshold
+    )
+    if regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1 if args.fail_on_regression else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+"""
+Load Test - Drive generate -> fetch -> submit sessions against the API
+
+Each simulated user session generates a challenge, downloads all four option
+clips and submits an answer. Sessions run on concurrent workers using
+httpx.AsyncClient, either in-process through ASGI (default, with the app's
+startup and shutdown run around the test) or against a running server.
+
+Usage (from backend/):
+    python -m benchmarks.load_test --concurrency 32 --duration 30
+    python -m benchmarks.load_test --mix easy=1,medium=2,hard=1 --sessions 500
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --concurrency 64
+
+In-process runs use the stub TTS engine unless TTS_BACKEND is set; start a
+server with TTS_BACKEND=stub to do the same over HTTP. The report gives
+throughput, p50/p95/p99 latency and error rate per route; raise
+--concurrency until throughput stops growing to find a worker's saturation
+point.
+"""
+
+import os
+
+os.environ.setdefault("TTS_BACKEND", "stub")
+# Stub clips are not decodable audio, so skip the ffmpeg stage
+os.environ.setdefault("AUDIO_PROCESSING", "off")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+# pylint: disable=wrong-import-position
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+ROUTE_GENERATE = "POST /api/challenge/audio/generate"
+ROUTE_OPTION = "GET /api/challenge/audio/{id}/option/{letter}"
+ROUTE_SUBMIT = "POST /api/challenge/audio/{id}/submit"
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """
+    Parse a difficulty mix such as "easy=1,medium=2,hard=1"
+
+    Returns:
+        Dict mapping difficulty to relative weight
+    """
+    mix = {}
+    for item in spec.split(","):
+        difficulty, _, weight = item.partition("=")
+        mix[difficulty.strip()] = float(weight) if weight else 1.0
+    if not mix or any(w < 0 for w in mix.values()) or not sum(mix.values()):
+        raise ValueError(f"Invalid mix '{spec}'")
+    return mix
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LoadStats:
+    """Latencies and outcomes per route."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.sessions = 0
+        self.failed_sessions = 0
+
+    def record(self, route: str, seconds: float, status: str, ok: bool) -> None:
+        self.latencies[route].append(seconds)
+        self.statuses[route][status] += 1
+        if not ok:
+            self.errors[route] += 1
+
+    def report(self, elapsed: float) -> Dict:
+        """Summarize the run as a JSON-serializable dict."""
+        routes = {}
+        total_requests = 0
+        for route, values in self.latencies.items():
+            values = sorted(values)
+            total_requests += len(values)
+            routes[route] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / elapsed, 1),
+                "p50_ms": round(percentile(values, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(values, 0.99) * 1000, 2),
+                "max_ms": round(values[-1] * 1000, 2),
+                "error_rate": round(self.errors[route] / len(values), 4),
+                "statuses": dict(self.statuses[route]),
+            }
+        return {
+            "elapsed_seconds": round(elapsed, 2),
+            "sessions": self.sessions,
+            "failed_sessions": self.failed_sessions,
+            "sessions_per_second": round(self.sessions / elapsed, 1),
+            "requests": total_requests,
+            "requests_per_second": round(total_requests / elapsed, 1),
+            "routes": routes,
+        }
+
+
+async def _timed(
+    stats: LoadStats, route: str, request
+) -> Tuple[Optional[httpx.Response], bool]:
+    """Await a request coroutine and record its latency and outcome."""
+    start = time.perf_counter()
+    try:
+        response = await request
+    except httpx.HTTPError as e:
+        stats.record(route, time.perf_counter() - start, type(e).__name__, False)
+        return None, False
+    ok = response.status_code < 400
+    stats.record(route, time.perf_counter() - start, str(response.status_code), ok)
+    return response, ok
+
+
+async def run_session(
+    client: httpx.AsyncClient, stats: LoadStats, difficulty: str, rng: random.Random
+) -> bool:
+    """
+    One user session: generate, fetch the four clips, submit an answer
+
+    Returns:
+        Whether every request in the session succeeded
+    """
+    response, ok = await _timed(
+        stats,
+        ROUTE_GENERATE,
+        client.post("/api/challenge/audio/generate", json={"difficulty": difficulty}),
+    )
+    if not ok:
+        return False
+    challenge = response.json()
+
+    fetches = [
+        _timed(stats, ROUTE_OPTION, client.get(option["audio_url"]))
+        for option in challenge["options"]
+    ]
+    results = await asyncio.gather(*fetches)
+    all_ok = all(ok for _, ok in results)
+
+    # Answer like a user who gets about two thirds right
+    letters = [option["letter"] for option in challenge["options"]]
+    answer = challenge["correct_answer"] if rng.random() < 0.66 else rng.choice(letters)
+    body = {"user_answer": answer, "user_id": rng.randint(1, 10000)}
+    if "token" in challenge:
+        body["token"] = challenge["token"]
+    _, ok = await _timed(
+        stats,
+        ROUTE_SUBMIT,
+        client.post(f"/api/challenge/audio/{challenge['id']}/submit", json=body),
+    )
+    return all_ok and ok
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    stats: LoadStats,
+    mix: Dict[str, float],
+    deadline: float,
+    remaining: List[int],
+    think_time: float,
+    seed: int,
+) -> None:
+    rng = random.Random(seed)
+    difficulties, weights = zip(*mix.items())
+    while time.perf_counter() < deadline:
+        if remaining[0] <= 0:
+            return
+        remaining[0] -= 1
+        difficulty = rng.choices(difficulties, weights)[0]
+        ok = await run_session(client, stats, difficulty, rng)
+        stats.sessions += 1
+        if not ok:
+            stats.failed_sessions += 1
+        if think_time:
+            await asyncio.sleep(rng.expovariate(1 / think_time))
+
+
+@asynccontextmanager
+async def _client(url: Optional[str], timeout: float):
+    """AsyncClient for a server URL, or for the app in-process via ASGI."""
+    limits = httpx.Limits(max_connections=None, max_keepalive_connections=None)
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=timeout, limits=limits) as c:
+            yield c
+        return
+
+    from main import app  # pylint: disable=import-outside-toplevel
+
+    # ASGITransport does not send lifespan events, so run startup/shutdown here
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://loadtest", timeout=timeout
+        ) as c:
+            yield c
+
+
+# What to do when a warm-up check fails
+_WARM_UP_HINTS = {
+    "word_index": "build the lexicon (python -m domain.utils.lexicon) or install "
+    "the NLTK Brown corpus, see the README setup steps",
+    "tts": "check the TTS backend (TTS_BACKEND, default stub for load tests)",
+}
+
+
+async def _wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    """
+    Poll /ready until the server is warm.
+
+    Raises:
+        RuntimeError: As soon as a warm-up attempt reports a failed check
+            (the server would keep retrying it), or after timeout seconds
+    """
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            response = await client.get("/ready")
+            if response.status_code == 200:
+                return
+            failed = [
+                name for name, ok in response.json().get("checks", {}).items() if not ok
+            ]
+        except (httpx.HTTPError, ValueError):
+            failed = []
+        if failed:
+            hints = "; ".join(
+                f"{name}: {_WARM_UP_HINTS.get(name, 'see the server log')}"
+                for name in failed
+            )
+            raise RuntimeError(f"Server warm-up failed ({hints})")
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server did not become ready within {timeout:.0f}s")
+
+
+async def run_load_test(
+    url: Optional[str],
+    concurrency: int,
+    duration: float,
+    sessions: Optional[int],
+    mix: Dict[str, float],
+    think_time: float = 0.0,
+    timeout: float = 30.0,
+    seed: int = 0,
+) -> Dict:
+    """
+    Run concurrent sessions until the duration or session count is reached
+
+    Args:
+        url: Server base URL, or None to call the app in-process
+        concurrency: Number of sessions running at the same time
+        duration: Maximum run time in seconds
+        sessions: Stop after this many sessions (None for no limit)
+        mix: Relative weight of each difficulty
+        think_time: Mean pause between a worker's sessions in seconds
+        timeout: Per-request timeout in seconds
+        seed: Random seed for difficulties and answers
+
+    Returns:
+        Report from LoadStats.report
+    """
+    stats = LoadStats()
+    async with _client(url, timeout) as client:
+        await _wait_until_ready(client)
+        remaining = [sessions if sessions is not None else sys.maxsize]
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(
+            *(
+                _worker(client, stats, mix, deadline, remaining, think_time, seed + i)
+                for i in range(concurrency)
+            )
+        )
+        elapsed = time.perf_counter() - start
+
+    report = stats.report(elapsed)
+    report["config"] = {
+        "target": url or "in-process (ASGI)",
+        "concurrency": concurrency,
+        "mix": mix,
+        "think_time": think_time,
+    }
+    return report
+
+
+def print_report(report: Dict) -> None:
+    print(
+        f"\n{report['sessions']} sessions ({report['failed_sessions']} failed) in "
+        f"{report['elapsed_seconds']}s: {report['sessions_per_second']} sessions/s, "
+        f"{report['requests_per_second']} requests/s"
+    )
+    print(
+        f"\n{'route':48s} {'reqs':>7s} {'rps':>8s} {'p50 ms':>8s} {'p95 ms':>8s}"
+        f" {'p99 ms':>8s} {'errors':>7s}"
+    )
+    for route, r in report["routes"].items():
+        print(
+            f"{route:48s} {r['requests']:>7d} {r['throughput_rps']:>8.1f}"
+            f" {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {r['p99_ms']:>8.2f}"
+            f" {r['error_rate']:>7.2%}"
+        )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test the audio challenge flow")
+    parser.add_argument("--url", help="server base URL (default: in-process ASGI)")
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="concurrent sessions"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--sessions", type=int, help="stop after this many sessions")
+    parser.add_argument(
+        "--mix", default="easy=1,medium=1,hard=1", help="difficulty weights"
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=0.0, help="mean pause between sessions (s)"
+    )
+    parser.add_argument(
+        "--timeout", type=float, default=30.0, help="request timeout (s)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="write the report as JSON here")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(
+            run_load_test(
+                args.url,
+                args.concurrency,
+                args.duration,
+                args.sessions,
+                parse_mix(args.mix),
+                args.think_time,
+                args.timeout,
+                args.seed,
+            )
+        )
+    except RuntimeError as e:
+        print(f"Load test aborted: {e}", file=sys.stderr)
+        return 1
+    print_report(report)
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        print(f"\nWrote report to {args.output}")
+
+    return 0 if report["sessions"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
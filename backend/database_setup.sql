@@ -16,7 +16,7 @@ CREATE TABLE IF NOT EXISTS user_progress (
 CREATE TABLE IF NOT EXISTS quiz_attempts (
     id SERIAL PRIMARY KEY,
     user_id INTEGER NOT NULL REFERENCES user_progress(user_id) ON DELETE CASCADE,
-    challenge_id INTEGER NOT NULL,
+    challenge_id BIGINT NOT NULL,  -- 53-bit IDs, see infrastructure/challenge_ids.py
     difficulty TEXT NOT NULL CHECK (difficulty IN ('easy', 'medium', 'hard')),
     user_answer TEXT NOT NULL,
     correct_answer TEXT NOT NULL,
@@ -4,39 +4,111 @@ Handles word selection, mispronunciation generation, and TTS audio creation.
 """
 
 import base64
-import io
+import os
 import random
-from typing import Dict, List
-
-from gtts import gTTS
-from domain.utils.word_picker import get_word_by_difficulty
-from infrastructure.audio_cache import cache_audio, cache_challenge
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from domain.utils.phoneme_neighbors import get_phoneme_neighbors, load_neighbor_index
+from domain.utils.word_picker import (
+    get_word_by_difficulty,
+    get_word_index,
+    sample_words,
+    word_index_is_fallback,
+)
+from infrastructure.audio_cache import (
+    cache_audio,
+    cache_challenge,
+    cache_synthesized_audio,
+    encoding_key,
+    get_cached_audio,
+    get_synthesized_audio,
+    synthesis_key,
+)
+from infrastructure.audio_processing import (
+    available_encodings,
+    process_audio,
+    select_encodings,
+)
+from infrastructure.challenge_ids import new_challenge_id
+from infrastructure.challenge_tokens import issue_challenge_token
+from infrastructure.metrics import TTS_ERRORS, TTS_IN_FLIGHT, TTS_REQUESTS, time_stage
+from infrastructure.tts_backends import get_tts_backend, sniff_media_type
+
+# Ways all four clips can be embedded in the challenge response
+BUNDLE_MODES = ("inline", "sprite")
+
+# Global cap on concurrent TTS calls across all requests in this process
+TTS_MAX_CONCURRENCY = int(os.environ.get("TTS_MAX_CONCURRENCY", "16"))
+# Maximum number of one request's options synthesized at the same time
+TTS_REQUEST_FANOUT = int(os.environ.get("TTS_REQUEST_FANOUT", "4"))
+# Same limit for batch generation, which has many more options to synthesize
+TTS_BATCH_FANOUT = int(os.environ.get("TTS_BATCH_FANOUT", "8"))
+
+_synthesis_pool = ThreadPoolExecutor(
+    max_workers=TTS_MAX_CONCURRENCY, thread_name_prefix="tts"
+)
+
+# Minimal pairs considered per word (the index lists vowel swaps first)
+NEIGHBOR_CHOICES = 4
 
 # Vowel-focused Mispronunciation Techniques
 
+VOWELS = "aeiouAEIOU"
+
+VOWEL_REPLACEMENTS = {
+    "e": "i",
+    "i": "e",
+    "a": "o",
+    "o": "a",
+    "u": "o",
+    # Capital letters for consistency
+    "E": "I",
+    "I": "E",
+    "A": "O",
+    "O": "A",
+    "U": "O",
+}
+
+
+@lru_cache(maxsize=65536)
+def _vowel_indices(word: str) -> Tuple[int, ...]:
+    """Positions of the vowels in a word, computed once per distinct word."""
+    return tuple(i for i, char in enumerate(word) if char in VOWELS)
+
+
+def _elongate_at(word: str, index: int, extra: int) -> str:
+    return word[: index + 1] + word[index] * extra + word[index + 1 :]
+
+
+def _replace_at(word: str, index: int) -> str:
+    replacement = VOWEL_REPLACEMENTS.get(word[index], word[index])
+    return word[:index] + replacement + word[index + 1 :]
+
+
+def _aspirate_at(word: str, index: int) -> str:
+    return word[: index + 1] + "h" + word[index + 1 :]
+
+
+def _normalize_pronunciation(spoken_text: str) -> str:
+    """Normalize for comparison (remove punctuation and spaces)."""
+    return spoken_text.replace(",", "").replace("-", "").replace(" ", "").lower()
+
 
 def elongate_vowel(word: str) -> str:
     """
     Elongate a random vowel to create a drawn-out pronunciation.
     Example: "me" -> "meeee"
     """
-    vowels = "aeiouAEIOU"
-    result = []
-    vowel_indices = [i for i, char in enumerate(word) if char in vowels]
+    vowel_indices = _vowel_indices(word)
 
     if not vowel_indices:
         return word  # No vowels to elongate
 
-    # Pick a random vowel to elongate
+    # Pick a random vowel to elongate and add 2-3 extra of the same vowel
     elongate_index = random.choice(vowel_indices)
-
-    for i, char in enumerate(word):
-        result.append(char)
-        if i == elongate_index:
-            # Add 2-3 extra of the same vowel
-            result.append(char * random.randint(2, 3))
-
-    return "".join(result)
+    return _elongate_at(word, elongate_index, random.randint(2, 3))
 
 
 def replace_vowel_with_similar(word: str) -> str:
@@ -44,35 +116,13 @@ def replace_vowel_with_similar(word: str) -> str:
     Replace a vowel with a similar-sounding one to create mispronunciation.
     Example: "me" -> "mi"
     """
-    vowel_replacements = {
-        "e": "i",
-        "i": "e",
-        "a": "o",
-        "o": "a",
-        "u": "o",
-        # Capital letters for consistency
-        "E": "I",
-        "I": "E",
-        "A": "O",
-        "O": "A",
-        "U": "O",
-    }
-
-    vowels = "aeiouAEIOU"
-    vowel_indices = [i for i, char in enumerate(word) if char in vowels]
+    vowel_indices = _vowel_indices(word)
 
     if not vowel_indices:
         return word  # No vowels to replace
 
     # Pick a random vowel to replace
-    replace_index = random.choice(vowel_indices)
-    original_char = word[replace_index]
-
-    if original_char in vowel_replacements:
-        replacement_char = vowel_replacements[original_char]
-        return word[:replace_index] + replacement_char + word[replace_index + 1 :]
-
-    return word
+    return _replace_at(word, random.choice(vowel_indices))
 
 
 def add_aspirated_vowel(word: str) -> str:
@@ -80,16 +130,13 @@ def add_aspirated_vowel(word: str) -> str:
     Add an 'h' after a vowel to create an aspirated or different sound.
     Example: "me" -> "meh"
     """
-    vowels = "aeiouAEIOU"
-    vowel_indices = [i for i, char in enumerate(word) if char in vowels]
+    vowel_indices = _vowel_indices(word)
 
     if not vowel_indices:
         return word  # No vowels to modify
 
     # Pick a random vowel to aspirate
-    aspirate_index = random.choice(vowel_indices)
-
-    return word[: aspirate_index + 1] + "h" + word[aspirate_index + 1 :]
+    return _aspirate_at(word, random.choice(vowel_indices))
 
 
 def create_pronunciation_variants(word: str) -> List[Dict[str, str]]:
@@ -116,6 +163,23 @@ def create_pronunciation_variants(word: str) -> List[Dict[str, str]]:
     technique_idx = 0
     max_attempts = 10  # Safety break
 
+    # Real words one phoneme away (minimal pairs) are the most plausible
+    # wrong options; the spelling techniques below fill any remaining slots
+    neighbors = get_phoneme_neighbors(word)[:NEIGHBOR_CHOICES]
+    for neighbor in random.sample(neighbors, min(3, len(neighbors))):
+        normalized = _normalize_pronunciation(neighbor)
+        if normalized not in used_pronunciations:
+            used_pronunciations.add(normalized)
+            variants.append(
+                {
+                    "word": word,
+                    "spoken_text": neighbor,
+                    "type": f"wrong_{wrong_count + 1}",
+                    "pattern": "minimal_pair",
+                }
+            )
+            wrong_count += 1
+
     while wrong_count < 3 and max_attempts > 0:
         max_attempts -= 1
 
@@ -125,8 +189,7 @@ def create_pronunciation_variants(word: str) -> List[Dict[str, str]]:
 
         misp = technique_func(word)
 
-        # Normalize for comparison (remove punctuation and spaces)
-        normalized = misp.replace(",", "").replace("-", "").replace(" ", "").lower()
+        normalized = _normalize_pronunciation(misp)
 
         # Check if unique and not the original word
         if normalized not in used_pronunciations and normalized != word.lower().replace(
@@ -177,26 +240,168 @@ def create_pronunciation_variants(word: str) -> List[Dict[str, str]]:
     return variants[:4]  # Return exactly 4
 
 
-def generate_audio_for_variant(variant: Dict, output_format: str = "bytes") -> bytes:
-    """
-    Generate audio for a pronunciation variant using Google TTS.
+# Random 32-bit numbers drawn per word by create_pronunciation_variants_batch:
+# vowel choices for the three techniques, elongation length, 3 shuffle swaps,
+# minimal pair selection
+_BATCH_DRAWS_PER_WORD = 8
+
+
+def create_pronunciation_variants_batch(
+    words: Sequence[str],
+) -> List[List[Dict[str, str]]]:
     """
-    try:
-        spoken_text = variant["spoken_text"]
-        pattern = variant["pattern"]
+    Create pronunciation variants for many words in one pass.
+
+    Produces the same kind of result as calling create_pronunciation_variants
+    on each word (1 correct + 3 unique wrong, shuffled) with less per-word
+    overhead: vowel positions come from a per-word cache, all randomness for
+    the batch is drawn with a single randbytes call, and each technique is
+    applied exactly once instead of going through the retry loop. Minimal
+    pairs from the phoneme neighbor index are used first, as in the scalar
+    function. Words without vowels fall back to create_pronunciation_variants.
+
+    Args:
+        words: Words to create variants for (duplicates allowed)
 
-        # Use slow speech for elongated/aspirated versions for a more noticeable effect
-        is_slow = (
-            pattern in ["elongate_vowel", "aspirated_vowel"] and random.random() > 0.5
+    Returns:
+        One list of 4 variants per word, in the same order
+    """
+    per_word = _BATCH_DRAWS_PER_WORD
+    draws = memoryview(random.randbytes(4 * per_word * len(words))).cast("I")
+
+    results = []
+    for n, word in enumerate(words):
+        vowel_indices = _vowel_indices(word)
+        if not vowel_indices:
+            results.append(create_pronunciation_variants(word))
+            continue
+
+        # (d * count) >> 32 maps a 32-bit draw onto range(count)
+        draw = draws[n * per_word : (n + 1) * per_word]
+        count = len(vowel_indices)
+
+        # No uniqueness check needed: replacing keeps the length but changes
+        # a vowel, aspirating adds one letter and elongating two or three, so
+        # the three mispronunciations always differ from each other and from
+        # the word, even after normalization
+        techniques = (
+            (
+                "elongate_vowel",
+                _elongate_at(
+                    word, vowel_indices[(draw[0] * count) >> 32], 2 + (draw[1] >> 31)
+                ),
+            ),
+            (
+                "replace_vowel",
+                _replace_at(word, vowel_indices[(draw[2] * count) >> 32]),
+            ),
+            (
+                "aspirated_vowel",
+                _aspirate_at(word, vowel_indices[(draw[3] * count) >> 32]),
+            ),
         )
 
-        tts = gTTS(text=spoken_text, lang="en", slow=is_slow, lang_check=False)
+        wrong = list(techniques)
+        neighbors = get_phoneme_neighbors(word)[:NEIGHBOR_CHOICES]
+        if neighbors:
+            # Up to 3 minimal pairs from a random rotation of the top choices,
+            # then techniques whose output is not one of those words
+            start = (draw[7] * len(neighbors)) >> 32
+            wrong = [
+                ("minimal_pair", neighbors[(start + k) % len(neighbors)])
+                for k in range(min(3, len(neighbors)))
+            ]
+            used = {word.lower()} | {text for _, text in wrong}
+            wrong += [
+                (pattern, text)
+                for pattern, text in techniques
+                if _normalize_pronunciation(text) not in used
+            ][: 3 - len(wrong)]
+            if len(wrong) < 3:
+                results.append(create_pronunciation_variants(word))
+                continue
+
+        variants = [
+            {"word": word, "spoken_text": word, "type": "correct", "pattern": "correct"}
+        ]
+        for i, (pattern, text) in enumerate(wrong):
+            variants.append(
+                {
+                    "word": word,
+                    "spoken_text": text,
+                    "type": f"wrong_{i + 1}",
+                    "pattern": pattern,
+                }
+            )
 
-        audio_fp = io.BytesIO()
-        tts.write_to_fp(audio_fp)
+        # Fisher-Yates shuffle using the pre-drawn numbers
+        for i, d in zip((3, 2, 1), draw[4:7]):
+            j = (d * (i + 1)) >> 32
+            variants[i], variants[j] = variants[j], variants[i]
 
-        audio_fp.seek(0)
-        audio_bytes = audio_fp.read()
+        results.append(variants)
+
+    return results
+
+
+def synthesize_variant(variant: Dict) -> str:
+    """
+    Make sure audio for a variant is in the synthesis cache.
+
+    The TTS backend is only called when the (spoken_text, lang, slow,
+    engine) combination has not been synthesized before. New clips are then
+    trimmed, normalized and encoded in every available quality tier.
+
+    Clips are looked up under the backend's preferred engine but stored
+    under the engine that actually produced them: a clip from a fallback
+    engine never answers later lookups, so the preferred engine is tried
+    again on the next request.
+
+    Returns:
+        Synthesis key of the variant's audio
+
+    Raises:
+        Exception: If the TTS backend fails
+    """
+    spoken_text = variant["spoken_text"]
+    pattern = variant["pattern"]
+
+    # Use slow speech for elongated/aspirated versions for a more noticeable effect
+    is_slow = pattern in ["elongate_vowel", "aspirated_vowel"] and random.random() > 0.5
+
+    backend = get_tts_backend()
+    audio_key = synthesis_key(spoken_text, "en", is_slow, backend.preferred_engine)
+
+    if get_synthesized_audio(audio_key) is None:
+        TTS_REQUESTS.inc(backend=backend.name)
+        try:
+            with TTS_IN_FLIGHT.track_in_progress(), time_stage("synthesis"):
+                audio_bytes, engine = backend.synthesize_with_engine(
+                    spoken_text, lang="en", slow=is_slow
+                )
+            if not audio_bytes:
+                raise RuntimeError(f"TTS backend returned no audio for {spoken_text!r}")
+        except Exception:
+            TTS_ERRORS.inc(backend=backend.name)
+            raise
+
+        audio_key = synthesis_key(spoken_text, "en", is_slow, engine)
+        with time_stage("processing"):
+            encodings = process_audio(audio_bytes)
+        # Encodings go in first: a cached original means they are there too
+        for encoding, encoded in encodings.items():
+            cache_synthesized_audio(encoding_key(audio_key, encoding), encoded)
+        cache_synthesized_audio(audio_key, audio_bytes)
+
+    return audio_key
+
+
+def generate_audio_for_variant(variant: Dict, output_format: str = "bytes") -> bytes:
+    """
+    Generate audio for a pronunciation variant using the configured TTS backend.
+    """
+    try:
+        audio_bytes = get_synthesized_audio(synthesize_variant(variant)) or b""
 
         if output_format == "base64":
             return base64.b64encode(audio_bytes).decode("utf-8")
@@ -209,33 +414,116 @@ def generate_audio_for_variant(variant: Dict, output_format: str = "bytes") -> b
         return b""
 
 
-def generate_audio_challenge(difficulty: str) -> Dict:
+def _try_synthesize_variant(variant: Dict) -> Optional[str]:
+    """synthesize_variant that returns None instead of raising."""
+    try:
+        return synthesize_variant(variant)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return None
+
+
+def synthesize_variants(
+    variants: List[Dict], fanout: int = TTS_REQUEST_FANOUT
+) -> List[Optional[str]]:
     """
-    Generate a complete audio challenge.
+    Synthesize audio for several variants concurrently.
+
+    At most fanout calls from this batch are in flight at once, and all
+    callers share the TTS_MAX_CONCURRENCY worker pool.
+
+    Args:
+        variants: Pronunciation variants to synthesize
+        fanout: Maximum calls from this batch running at the same time
+
+    Returns:
+        Synthesis key for each variant, in the same order (None on failure)
     """
-    # Get random word based on difficulty
-    word = get_word_by_difficulty(difficulty)
+    results: List[Optional[str]] = [None] * len(variants)
+    pending = {}
+    queued = iter(enumerate(variants))
 
-    # Get pronunciation variants (1 correct + 3 wrong)
-    variants = create_pronunciation_variants(word)
+    def _submit_next() -> bool:
+        item = next(queued, None)
+        if item is None:
+            return False
+        i, variant = item
+        pending[_synthesis_pool.submit(_try_synthesize_variant, variant)] = i
+        return True
+
+    for _ in range(max(1, fanout)):
+        if not _submit_next():
+            break
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+            _submit_next()
+
+    return results
+
+
+def warm_up() -> Dict[str, bool]:
+    """
+    Load the heavy resources challenge generation depends on.
+
+    Meant to run once from the application startup hook so the first
+    request does not pay for them.
 
+    Returns:
+        Dict mapping each resource to whether it is ready
+    """
+    status = {}
+
+    try:
+        # The built-in fallback list keeps requests working but is not ready
+        index = get_word_index(retry_fallback=True)
+        status["word_index"] = len(index) > 0 and not word_index_is_fallback()
+    except Exception:  # pylint: disable=broad-exception-caught
+        status["word_index"] = False
+
+    # Optional: without a built index, variants use spelling techniques only
+    load_neighbor_index()
+    # Optional too: without ffmpeg, clips are served as synthesized
+    available_encodings()
+
+    try:
+        status["tts"] = get_tts_backend().warm_up()
+    except Exception:  # pylint: disable=broad-exception-caught
+        status["tts"] = False
+
+    return status
+
+
+def _assemble_challenge(
+    word: str, difficulty: str, variants: List[Dict], audio_keys: List[Optional[str]]
+) -> Dict:
+    """
+    Cache a challenge and its option audio, and build the API response.
+
+    Args:
+        word: Correct word
+        difficulty: Difficulty level
+        variants: Shuffled pronunciation variants (1 correct + 3 wrong)
+        audio_keys: Synthesis key for each variant (None if synthesis failed)
+
+    Returns:
+        Challenge data as returned to the client
+    """
     # Find correct answer position
     correct_index = next(i for i, v in enumerate(variants) if v["type"] == "correct")
     correct_letter = chr(65 + correct_index)  # A, B, C, D
 
-    # Generate challenge ID
-    challenge_id = random.randint(10000, 99999)
+    # Generate a unique, time-ordered challenge ID
+    challenge_id = new_challenge_id()
 
-    # Generate and cache audio for each variant
+    # Point each option at its synthesized audio
     options_data = []
-    for i, variant in enumerate(variants):
+    for i, (variant, audio_key) in enumerate(zip(variants, audio_keys)):
         option_letter = chr(65 + i)
 
-        # Generate audio
-        audio_bytes = generate_audio_for_variant(variant, output_format="bytes")
-
-        # Cache the audio
-        cache_audio(challenge_id, option_letter, audio_bytes)
+        if audio_key is not None:
+            cache_audio(challenge_id, option_letter, audio_key)
 
         options_data.append(
             {
@@ -260,7 +548,7 @@ def generate_audio_challenge(difficulty: str) -> Dict:
     # XP reward based on difficulty
     xp_map = {"easy": 10, "medium": 15, "hard": 20}
 
-    return {
+    challenge_data = {
         "id": challenge_id,
         "word": word,
         "difficulty": difficulty,
@@ -271,3 +559,138 @@ def generate_audio_challenge(difficulty: str) -> Dict:
         "options": options_data,
         "correct_answer": correct_letter,
     }
+
+    # Signed token for stateless grading (only when tokens are enabled)
+    token = issue_challenge_token(challenge_id, difficulty, correct_letter, word)
+    if token is not None:
+        challenge_data["token"] = token
+
+    return challenge_data
+
+
+def generate_audio_challenge(difficulty: str) -> Dict:
+    """
+    Generate a complete audio challenge.
+    """
+    # Get random word based on difficulty
+    with time_stage("word_pick"):
+        word = get_word_by_difficulty(difficulty)
+
+    # Get pronunciation variants (1 correct + 3 wrong)
+    with time_stage("variants"):
+        variants = create_pronunciation_variants(word)
+
+    # Synthesize audio for all variants concurrently (reusing cached clips)
+    with time_stage("audio"):
+        audio_keys = synthesize_variants(variants)
+
+    with time_stage("caching"):
+        return _assemble_challenge(word, difficulty, variants, audio_keys)
+
+
+def generate_audio_challenges(
+    difficulty: str,
+    count: int,
+    exclude: Optional[Iterable[str]] = None,
+    require_audio: bool = False,
+) -> List[Dict]:
+    """
+    Generate several audio challenges with distinct words in one pass.
+
+    Words are drawn with a single sample_words call and the audio for every
+    option of every challenge goes through one shared synthesis fan-out.
+
+    Args:
+        difficulty: Difficulty level
+        count: Number of challenges
+        exclude: Words not to use (e.g. already seen in the session)
+        require_audio: Drop challenges with an option whose synthesis
+            failed instead of returning them (used by the warm pool)
+
+    Returns:
+        List of challenge data, one per word (fewer with require_audio)
+
+    Raises:
+        ValueError: If the difficulty band has fewer than count usable words
+        RuntimeError: With require_audio, if no challenge got all its audio
+    """
+    with time_stage("word_pick"):
+        words = sample_words(difficulty, count, exclude=exclude)
+    with time_stage("variants"):
+        variant_sets = create_pronunciation_variants_batch(words)
+
+    all_variants = [variant for variants in variant_sets for variant in variants]
+    with time_stage("audio"):
+        all_keys = synthesize_variants(all_variants, fanout=TTS_BATCH_FANOUT)
+
+    challenges = []
+    offset = 0
+    with time_stage("caching"):
+        for word, variants in zip(words, variant_sets):
+            audio_keys = all_keys[offset : offset + len(variants)]
+            offset += len(variants)
+            if require_audio and None in audio_keys:
+                continue
+            challenges.append(
+                _assemble_challenge(word, difficulty, variants, audio_keys)
+            )
+
+    if require_audio and not challenges:
+        raise RuntimeError(f"TTS backend produced no audio for {count} challenges")
+    return challenges
+
+
+def bundle_challenge_audio(challenge: Dict, mode: str) -> Dict:
+    """
+    Embed the audio of every option in the challenge response.
+
+    Saves the client the four option downloads after generating a challenge.
+    Clips are embedded in the default quality tier.
+
+    Args:
+        challenge: Challenge data as returned by generate_audio_challenge
+        mode: "inline" adds base64 audio to each option; "sprite" adds one
+            base64 blob of all clips concatenated plus each option's byte
+            offset and length within it
+
+    Returns:
+        Copy of the challenge data with the audio embedded
+    """
+    if mode not in BUNDLE_MODES:
+        raise ValueError(f"Bundle mode must be one of {', '.join(BUNDLE_MODES)}")
+
+    bundled = dict(challenge)
+    clips = [
+        get_cached_audio(challenge["id"], option["letter"], select_encodings()) or b""
+        for option in challenge["options"]
+    ]
+
+    if mode == "inline":
+        bundled["options"] = [
+            {
+                **option,
+                "media_type": sniff_media_type(clip),
+                "audio_base64": base64.b64encode(clip).decode("utf-8"),
+            }
+            for option, clip in zip(challenge["options"], clips)
+        ]
+        return bundled
+
+    segments = []
+    offset = 0
+    for option, clip in zip(challenge["options"], clips):
+        segments.append(
+            {
+                "letter": option["letter"],
+                "offset": offset,
+                "length": len(clip),
+                "media_type": sniff_media_type(clip),
+            }
+        )
+        offset += len(clip)
+
+    bundled["audio_sprite"] = {
+        "data": base64.b64encode(b"".join(clips)).decode("utf-8"),
+        "segments": segments,
+    }
+    return bundled
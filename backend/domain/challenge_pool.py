@@ -0,0 +1,201 @@
+"""
+Challenge Pool - Warm pool of pre-generated audio challenges
+
+A background producer keeps up to CHALLENGE_POOL_SIZE fully generated,
+audio-cached challenges ready per difficulty and tops a difficulty back
+up once it drops to CHALLENGE_POOL_LOW_WATERMARK. The generate endpoint
+pops from the pool, moving word selection and synthesis off the request
+path.
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional
+
+from infrastructure.audio_cache import get_cached_challenge
+
+logger = logging.getLogger(__name__)
+
+# Challenges kept ready per difficulty (0 disables the pool)
+CHALLENGE_POOL_SIZE = int(os.environ.get("CHALLENGE_POOL_SIZE", "0"))
+# Refill a difficulty once it holds this many challenges or fewer
+CHALLENGE_POOL_LOW_WATERMARK = int(
+    os.environ.get("CHALLENGE_POOL_LOW_WATERMARK", str(CHALLENGE_POOL_SIZE // 2))
+)
+# Challenges generated per batch while refilling
+CHALLENGE_POOL_BATCH_SIZE = int(os.environ.get("CHALLENGE_POOL_BATCH_SIZE", "8"))
+
+GenerateBatch = Callable[[str, int, Iterable[str]], List[Dict]]
+
+
+class ChallengePool:
+    """Per-difficulty queues of ready challenges refilled by one producer thread."""
+
+    def __init__(
+        self,
+        generate: GenerateBatch,
+        target_size: int,
+        low_watermark: int,
+        batch_size: int = CHALLENGE_POOL_BATCH_SIZE,
+        difficulties: Iterable[str] = ("easy", "medium", "hard"),
+    ):
+        """
+        Args:
+            generate: Function producing (difficulty, count, exclude_words)
+                cached challenges with distinct words and audio for every
+                option; it should raise (or return none) when the TTS
+                backend fails, so the producer backs off
+            target_size: Challenges to keep ready per difficulty
+            low_watermark: Refill a difficulty when it holds this many or fewer
+            batch_size: Maximum challenges generated per producer step
+            difficulties: Difficulty levels to keep pools for
+        """
+        self.generate = generate
+        self.target_size = target_size
+        self.low_watermark = min(low_watermark, target_size - 1)
+        self.batch_size = max(1, batch_size)
+        self._queues: Dict[str, Deque[Dict]] = {d: deque() for d in difficulties}
+        self._refilling = set(self._queues)
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start the background producer."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="challenge-pool", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background producer after its current generation."""
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+
+    def pop(self, difficulty: str) -> Optional[Dict]:
+        """
+        Take a ready challenge.
+
+        Challenges whose cache entries expired or were evicted while
+        waiting in the pool are discarded.
+
+        Returns:
+            Challenge response data, or None if the pool is empty
+        """
+        queue = self._queues.get(difficulty)
+        if queue is None:
+            return None
+
+        while True:
+            with self._condition:
+                candidate = queue.popleft() if queue else None
+                if (
+                    len(queue) <= self.low_watermark
+                    and difficulty not in self._refilling
+                ):
+                    self._refilling.add(difficulty)
+                    self._condition.notify()
+
+            if candidate is None:
+                return None
+            # The cache lookup may be disk or network I/O, so it runs without
+            # the lock; other pops and the producer carry on meanwhile
+            if get_cached_challenge(candidate["id"]) is not None:
+                return candidate
+
+    def sizes(self) -> Dict[str, int]:
+        """Number of ready challenges per difficulty."""
+        return {difficulty: len(queue) for difficulty, queue in self._queues.items()}
+
+    def _next_refill(self) -> Optional[tuple]:
+        """
+        Block until some difficulty needs refilling.
+
+        Returns:
+            (difficulty, count, words already pooled), or None once stopped
+        """
+        with self._condition:
+            while not self._stopped.is_set():
+                for difficulty in self._refilling:
+                    queue = self._queues[difficulty]
+                    missing = self.target_size - len(queue)
+                    if missing > 0:
+                        pooled_words = [c["word"] for c in queue]
+                        return difficulty, min(missing, self.batch_size), pooled_words
+                self._refilling.clear()
+                self._condition.wait()
+        return None
+
+    def _run(self) -> None:
+        while True:
+            refill = self._next_refill()
+            if refill is None:
+                return
+            difficulty, count, pooled_words = refill
+            try:
+                challenges = self.generate(difficulty, count, pooled_words)
+                if not challenges:
+                    raise RuntimeError("no challenges generated")
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning(
+                    "Challenge pool failed to generate %s challenges: %s", difficulty, e
+                )
+                # Back off instead of spinning on a failing TTS backend
+                self._stopped.wait(1.0)
+                continue
+            with self._condition:
+                self._queues[difficulty].extend(challenges)
+
+
+_pool: Optional[ChallengePool] = None
+
+
+def start_challenge_pool(generate: GenerateBatch) -> Optional[ChallengePool]:
+    """
+    Start the process-wide pool if CHALLENGE_POOL_SIZE is positive.
+
+    Args:
+        generate: Function producing (difficulty, count, exclude_words)
+            cached challenges with distinct words and complete audio
+
+    Returns:
+        The running pool, or None when pooling is disabled
+    """
+    global _pool  # pylint: disable=global-statement
+
+    if _pool is None and CHALLENGE_POOL_SIZE > 0:
+        _pool = ChallengePool(
+            generate, CHALLENGE_POOL_SIZE, CHALLENGE_POOL_LOW_WATERMARK
+        )
+        _pool.start()
+    return _pool
+
+
+def stop_challenge_pool() -> None:
+    """Stop the process-wide pool if it is running."""
+    global _pool  # pylint: disable=global-statement
+
+    if _pool is not None:
+        _pool.stop()
+        _pool = None
+
+
+def pop_pooled_challenge(difficulty: str) -> Optional[Dict]:
+    """
+    Take a ready challenge from the process-wide pool.
+
+    Returns:
+        Challenge response data, or None if pooling is disabled or empty
+    """
+    pool = _pool
+    return pool.pop(difficulty) if pool is not None else None
+
+
+def get_pool_sizes() -> Dict[str, int]:
+    """Ready challenges per difficulty (empty when pooling is disabled)."""
+    pool = _pool
+    return pool.sizes() if pool is not None else {}
@@ -0,0 +1,221 @@
+"""
+Lexicon
+Frequency-ranked word index and its compact on-disk format.
+
+The binary lexicon lets every backend worker mmap the same read-only file
+instead of loading the Brown corpus through NLTK and holding its own copy
+of the derived word lists.
+
+File layout (all integers little-endian uint32 unless noted):
+
+    header   magic b"PCLX", version (uint16), band count (uint16),
+             word count, word blob length
+    bands    band count x (name: 8 bytes NUL-padded, start rank, end rank)
+    offsets  word count + 1 byte offsets into the word blob
+    weights  word count cumulative long-word token counts
+    blob     UTF-8 words concatenated in rank order
+
+Build it with:
+
+    python -m domain.utils.lexicon [--output PATH]
+"""
+
+import argparse
+import bisect
+import mmap
+import os
+import random
+import struct
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Tuple
+
+# Frequency-rank bands [start, end) for each difficulty level
+DIFFICULTY_BANDS: Dict[str, Tuple[int, int]] = {
+    "easy": (0, 100),
+    "medium": (100, 1000),
+    "hard": (1000, 5000),
+}
+
+DEFAULT_LEXICON_PATH = Path(__file__).with_name("lexicon.bin")
+
+_MAGIC = b"PCLX"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHII")
+_BAND = struct.Struct("<8sII")
+
+
+@dataclass(frozen=True)
+class WordIndex:
+    """
+    Frequency-ranked view of the corpus vocabulary.
+
+    words[rank] is the rank-th most common lowercase alphabetic word.
+    long_cum_weights[rank] is the running token count of words longer than
+    3 letters up to and including that rank, so a token-weighted draw over
+    long words is a single bisect.
+    """
+    words: Sequence[str]
+    long_cum_weights: Sequence[int]
+    bands: Dict[str, Tuple[int, int]] = field(default_factory=lambda: dict(DIFFICULTY_BANDS))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def random_long_word(self) -> str:
+        """Pick a word longer than 3 letters, weighted by corpus frequency."""
+        total = self.long_cum_weights[-1] if len(self.long_cum_weights) else 0
+        if total == 0:
+            raise ValueError("Word index has no long words")
+        return self.words[bisect.bisect_right(self.long_cum_weights, random.randrange(total))]
+
+
+def build_word_index(tokens: Iterable[str]) -> WordIndex:
+    """
+    Build a WordIndex from an iterable of corpus tokens.
+
+    Args:
+        tokens: Iterable of raw corpus tokens (e.g. brown.words())
+
+    Returns:
+        WordIndex ranked by descending frequency
+    """
+    frequency = Counter(w.lower() for w in tokens if w.isalpha())
+
+    words = []
+    long_cum_weights = []
+    running = 0
+    for word, count in frequency.most_common():
+        if len(word) > 3:
+            running += count
+        words.append(word)
+        long_cum_weights.append(running)
+
+    return WordIndex(words=words, long_cum_weights=long_cum_weights)
+
+
+class _MappedWords(Sequence):
+    """Read-only word sequence decoded on access from an mmapped blob."""
+
+    def __init__(self, offsets: memoryview, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, rank):
+        if isinstance(rank, slice):
+            return [self[i] for i in range(*rank.indices(len(self)))]
+        if rank < 0:
+            rank += len(self)
+        if not 0 <= rank < len(self):
+            raise IndexError("word rank out of range")
+        return str(self._blob[self._offsets[rank] : self._offsets[rank + 1]], "utf-8")
+
+
+def write_lexicon(index: WordIndex, path: Path) -> int:
+    """
+    Write a WordIndex to the binary lexicon format.
+
+    Args:
+        index: Word index to serialize
+        path: Destination file (replaced atomically)
+
+    Returns:
+        Number of bytes written
+    """
+    encoded = [w.encode("utf-8") for w in index.words]
+    offsets = [0]
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    blob = b"".join(encoded)
+
+    parts = [_HEADER.pack(_MAGIC, _VERSION, len(index.bands), len(encoded), len(blob))]
+    for name, (start, end) in index.bands.items():
+        parts.append(_BAND.pack(name.encode("ascii"), start, end))
+    parts.append(struct.pack(f"<{len(offsets)}I", *offsets))
+    parts.append(struct.pack(f"<{len(encoded)}I", *index.long_cum_weights))
+    parts.append(blob)
+    data = b"".join(parts)
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+    return len(data)
+
+
+def load_lexicon(path: Path) -> WordIndex:
+    """
+    Map a binary lexicon file read-only and wrap it as a WordIndex.
+
+    Words and weights are read straight from the shared mapping, so
+    workers loading the same file share its pages.
+
+    Raises:
+        OSError: If the file cannot be opened
+        ValueError: If the file is not a valid lexicon
+    """
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    view = memoryview(mapped)
+    magic, version, band_count, word_count, blob_length = _HEADER.unpack_from(view, 0)
+    if magic != _MAGIC or version != _VERSION:
+        raise ValueError(f"{path} is not a version {_VERSION} lexicon file")
+
+    pos = _HEADER.size
+    bands = {}
+    for _ in range(band_count):
+        name, start, end = _BAND.unpack_from(view, pos)
+        bands[name.rstrip(b"\0").decode("ascii")] = (start, end)
+        pos += _BAND.size
+
+    def _uint32_array(start: int, count: int) -> memoryview:
+        chunk = view[start : start + 4 * count]
+        if sys.byteorder == "little":
+            return chunk.cast("I")
+        # Big-endian hosts pay for one private copy instead of sharing pages
+        values = struct.unpack(f"<{count}I", chunk)
+        return memoryview(struct.pack(f"={count}I", *values)).cast("I")
+
+    offsets = _uint32_array(pos, word_count + 1)
+    pos += 4 * (word_count + 1)
+    weights = _uint32_array(pos, word_count)
+    pos += 4 * word_count
+    blob = view[pos : pos + blob_length]
+    if len(blob) != blob_length:
+        raise ValueError(f"{path} is truncated")
+
+    return WordIndex(
+        words=_MappedWords(offsets, blob), long_cum_weights=weights, bands=bands
+    )
+
+
+def lexicon_path() -> Path:
+    """Lexicon location, overridable with the LEXICON_PATH environment variable."""
+    return Path(os.environ.get("LEXICON_PATH", DEFAULT_LEXICON_PATH))
+
+
+def main() -> None:
+    """Build the binary lexicon from the NLTK Brown corpus."""
+    parser = argparse.ArgumentParser(description="Build the word lexicon file")
+    parser.add_argument(
+        "--output", type=Path, default=lexicon_path(), help="Output lexicon path"
+    )
+    args = parser.parse_args()
+
+    import nltk  # pylint: disable=import-outside-toplevel
+
+    nltk.download("brown", quiet=True)
+    from nltk.corpus import brown  # pylint: disable=import-outside-toplevel
+
+    index = build_word_index(brown.words())
+    size = write_lexicon(index, args.output)
+    print(f"Wrote {len(index)} words ({size} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Phoneme Neighbors
+Minimal-pair index built offline from the CMU Pronouncing Dictionary.
+
+Maps each word to real words whose pronunciation differs from it by exactly
+one phoneme ("ship" -> "sheep", "shop", "chip"), vowel substitutions first.
+Spoken by the TTS engine, these make far more plausible wrong options than
+spelling tricks, and looking them up at request time is a dict access.
+
+File format: JSON object {word: [neighbor, ...]}, neighbors in preference
+order (vowel swaps first, then consonant swaps, more frequent words first).
+
+Build it with:
+
+    python -m domain.utils.phoneme_neighbors [--output PATH] [--all-words]
+
+By default only words in the frequency-ranked word index are indexed and
+offered as neighbors, which keeps the file small and the distractors
+common; --all-words uses every alphabetic CMUdict entry instead.
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEIGHBORS_PATH = Path(__file__).with_name("phoneme_neighbors.json")
+
+# Neighbors stored per word
+MAX_NEIGHBORS = 8
+
+Pronunciation = Tuple[str, ...]
+
+
+def _strip_stress(phonemes: Iterable[str]) -> Pronunciation:
+    """Drop CMUdict stress digits ("AH0" -> "AH") so pairs compare by sound."""
+    return tuple(p.rstrip("012") for p in phonemes)
+
+
+def _is_vowel(phoneme: str) -> bool:
+    # CMUdict marks stress on vowels only, and every vowel phoneme starts
+    # with a vowel letter (AA, AE, ..., UW)
+    return phoneme[0] in "AEIOU"
+
+
+def build_neighbor_index(
+    pronunciations: Mapping[str, Sequence[Sequence[str]]],
+    vocabulary: Optional[Sequence[str]] = None,
+    max_neighbors: int = MAX_NEIGHBORS,
+) -> Dict[str, List[str]]:
+    """
+    Find the one-phoneme substitution neighbors of every word.
+
+    Each pronunciation is entered into one bucket per position with that
+    phoneme masked out, so words sharing a bucket differ only there.
+
+    Args:
+        pronunciations: Word -> list of pronunciations (CMUdict phoneme lists)
+        vocabulary: Words to index and offer as neighbors, most frequent
+            first (None for every alphabetic word in pronunciations)
+        max_neighbors: Neighbors kept per word
+
+    Returns:
+        Dict mapping each word with at least one neighbor to its neighbors,
+        vowel substitutions first, then by vocabulary rank
+    """
+    if vocabulary is None:
+        vocabulary = sorted(w for w in pronunciations if w.isalpha())
+    rank = {}
+    for word in vocabulary:
+        if word in pronunciations and word.isalpha():
+            rank.setdefault(word, len(rank))
+
+    prons = {word: {_strip_stress(p) for p in pronunciations[word]} for word in rank}
+
+    # (position, pronunciation with that phoneme masked) -> [(word, phoneme)]
+    buckets: Dict[Tuple[int, Pronunciation], List[Tuple[str, str]]] = defaultdict(list)
+    for word, word_prons in prons.items():
+        for pron in word_prons:
+            for i, phoneme in enumerate(pron):
+                buckets[(i, pron[:i] + ("",) + pron[i + 1 :])].append((word, phoneme))
+
+    index = {}
+    for word, word_prons in prons.items():
+        # word -> (0 for a vowel swap else 1, rank)
+        found: Dict[str, Tuple[int, int]] = {}
+        for pron in word_prons:
+            for i, phoneme in enumerate(pron):
+                bucket = buckets[(i, pron[:i] + ("",) + pron[i + 1 :])]
+                for other, other_phoneme in bucket:
+                    # Skip the word itself and homophones of any of its readings
+                    if (
+                        other == word
+                        or other_phoneme == phoneme
+                        or prons[other] & word_prons
+                    ):
+                        continue
+                    key = (0 if _is_vowel(phoneme) else 1, rank[other])
+                    if other not in found or key < found[other]:
+                        found[other] = key
+        if found:
+            ordered = sorted(found, key=found.__getitem__)
+            index[word] = ordered[:max_neighbors]
+
+    return index
+
+
+def write_neighbor_index(index: Dict[str, List[str]], path: Path) -> int:
+    """
+    Write the index as compact JSON
+
+    Returns:
+        Size of the file in bytes
+    """
+    data = json.dumps(index, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    path.write_bytes(data)
+    return len(data)
+
+
+def neighbors_path() -> Path:
+    """Index location, overridable with the PHONEME_NEIGHBORS_PATH environment variable."""
+    return Path(os.environ.get("PHONEME_NEIGHBORS_PATH", DEFAULT_NEIGHBORS_PATH))
+
+
+_neighbors: Optional[Dict[str, List[str]]] = None
+_neighbors_lock = threading.Lock()
+
+
+def load_neighbor_index() -> Dict[str, List[str]]:
+    """
+    Return the process-wide neighbor index, reading the file on first use.
+
+    Returns:
+        Word -> neighbors, or an empty dict if the index has not been built
+    """
+    global _neighbors  # pylint: disable=global-statement
+
+    if _neighbors is None:
+        with _neighbors_lock:
+            if _neighbors is None:
+                path = neighbors_path()
+                index: Dict[str, List[str]] = {}
+                if path.exists():
+                    try:
+                        index = json.loads(path.read_bytes())
+                    except (OSError, ValueError) as e:
+                        logger.error("Error loading phoneme neighbors: %s", e)
+                _neighbors = index
+
+    return _neighbors
+
+
+def get_phoneme_neighbors(word: str) -> List[str]:
+    """
+    Real words one phoneme away from word, vowel swaps first
+
+    Returns:
+        Neighbors in preference order (empty if unknown or no index)
+    """
+    return load_neighbor_index().get(word.lower(), [])
+
+
+def main() -> None:
+    """Build the neighbor index from the NLTK CMU Pronouncing Dictionary."""
+    parser = argparse.ArgumentParser(description="Build the phoneme neighbor index")
+    parser.add_argument(
+        "--output", type=Path, default=neighbors_path(), help="Output index path"
+    )
+    parser.add_argument(
+        "--all-words",
+        action="store_true",
+        help="Index every CMUdict word instead of the word index vocabulary",
+    )
+    parser.add_argument(
+        "--max-neighbors", type=int, default=MAX_NEIGHBORS, help="Neighbors per word"
+    )
+    args = parser.parse_args()
+
+    import nltk  # pylint: disable=import-outside-toplevel
+
+    nltk.download("cmudict", quiet=True)
+    from nltk.corpus import cmudict  # pylint: disable=import-outside-toplevel
+
+    vocabulary = None
+    if not args.all_words:
+        from domain.utils.word_picker import (  # pylint: disable=import-outside-toplevel
+            get_word_index,
+        )
+
+        vocabulary = list(get_word_index().words)
+
+    index = build_neighbor_index(cmudict.dict(), vocabulary, args.max_neighbors)
+    size = write_neighbor_index(index, args.output)
+    print(f"Wrote neighbors for {len(index)} words ({size} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
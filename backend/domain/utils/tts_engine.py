@@ -8,9 +8,12 @@ Provides text-to-speech functionality using pyttsx3 (offline, cross-platform).
 """
 
 import importlib
+import importlib.util
+import os
 import subprocess
 import sys
-from typing import List
+import tempfile
+from typing import List, Optional
 
 
 def _ensure_package(pkg_name: str) -> bool:
@@ -35,7 +38,7 @@ def _ensure_package(pkg_name: str) -> bool:
             return False
 
 
-def get_tts_engine(rate: int = 160, volume: float = 1.0):
+def get_tts_engine(rate: int = 160, volume: float = 1.0, auto_install: bool = True):
     """
     Initialize pyttsx3 TTS engine.
     Works offline on Windows (SAPI5), macOS, and Linux.
@@ -45,11 +48,16 @@ def get_tts_engine(rate: int = 160, volume: float = 1.0):
     Args:
         rate: Speech rate (words per minute)
         volume: Volume level (0.0 to 1.0)
+        auto_install: pip-install pyttsx3 if it is missing (the server
+            passes False; it lists pyttsx3 in requirements.txt instead)
 
     Returns:
         TTS engine instance or None if unavailable
     """
-    if not _ensure_package("pyttsx3"):
+    if auto_install:
+        if not _ensure_package("pyttsx3"):
+            return None
+    elif importlib.util.find_spec("pyttsx3") is None:
         return None
 
     try:
@@ -88,6 +96,47 @@ def speak_text(text: str, engine=None) -> bool:
         return False
 
 
+def synthesize_to_bytes(
+    text: str, engine=None, rate: Optional[int] = None
+) -> Optional[bytes]:
+    """
+    Render text to an audio file and return its bytes instead of playing it.
+
+    The container format depends on the platform driver (WAV on eSpeak and
+    SAPI5, AIFF on macOS).
+
+    Args:
+        text: Text to synthesize
+        engine: Pre-initialized TTS engine (or None to create new)
+        rate: Speech rate override (words per minute)
+
+    Returns:
+        Audio bytes, or None if synthesis failed
+    """
+    if engine is None:
+        engine = get_tts_engine()
+
+    if engine is None:
+        return None
+
+    fd, path = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        if rate is not None:
+            engine.setProperty("rate", rate)
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+        with open(path, "rb") as f:
+            return f.read() or None
+    except Exception:
+        return None
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
 def speak_word_list(words: List[str], engine=None, boost: int = 1) -> None:
     """
     Speak multiple words with pauses.
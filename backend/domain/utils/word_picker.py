@@ -3,43 +3,130 @@ Word Picker Utility
 Original Author: uziellopez7
 Moved from: QuizPython/Random_Word_Picker.py
 Modified for: FastAPI backend integration
+
+Every picker below samples from a frequency-ranked WordIndex that is
+loaded once per process: mmapped from the prebuilt lexicon file when it
+exists (no NLTK needed), otherwise built from the Brown corpus.
 """
 
+import logging
 import random
 import ssl
-from collections import Counter
-
-import nltk
-from nltk.corpus import brown
+import threading
+from typing import Iterable, List, Optional, Tuple
 
-# SSL workaround for macOS
-try:
-    _create_unverified_https_context = ssl._create_unverified_context
-except AttributeError:
-    pass
-else:
-    ssl._create_default_https_context = _create_unverified_https_context
+from domain.utils.lexicon import (
+    DIFFICULTY_BANDS,
+    WordIndex,
+    build_word_index,
+    lexicon_path,
+    load_lexicon,
+)
 
+logger = logging.getLogger(__name__)
 
 # Download required NLTK data (run once)
 def _ensure_brown_corpus():
     """Ensure Brown corpus is downloaded"""
+    import nltk  # pylint: disable=import-outside-toplevel
+
     try:
         nltk.data.find("corpora/brown")
         return True
     except LookupError:
+        # SSL workaround for macOS, scoped to the download instead of
+        # patching the process-wide default context
+        default_context = ssl._create_default_https_context
+        ssl._create_default_https_context = getattr(
+            ssl, "_create_unverified_context", default_context
+        )
         try:
-            print("Downloading NLTK Brown corpus (first time only)...")
+            logger.info("Downloading NLTK Brown corpus (first time only)...")
             nltk.download("brown", quiet=True)
             return True
         except Exception as e:
-            print(f"Error downloading Brown corpus: {e}")
-            print("Please run: python3 download_nltk_data.py")
+            logger.error(
+                "Error downloading Brown corpus: %s. "
+                "Please run: python3 download_nltk_data.py",
+                e,
+            )
             return False
+        finally:
+            ssl._create_default_https_context = default_context
+
+
+# Fallback to basic English words when the corpus is unavailable
+_FALLBACK_WORDS = [
+    "hello",
+    "world",
+    "python",
+    "computer",
+    "programming",
+    "developer",
+    "software",
+    "application",
+    "database",
+    "server",
+]
+
+
+def _load_brown_index() -> WordIndex:
+    """Build the index from the NLTK Brown corpus (slow path, needs NLTK)."""
+    _ensure_brown_corpus()
+    from nltk.corpus import brown  # pylint: disable=import-outside-toplevel
+
+    index = build_word_index(brown.words())
+    if not index.words:
+        raise ValueError("Brown corpus is empty")
+    return index
+
+
+_word_index: Optional[WordIndex] = None
+# Whether _word_index was built from _FALLBACK_WORDS
+_word_index_is_fallback = False
+_word_index_lock = threading.Lock()
+
+
+def get_word_index(retry_fallback: bool = False) -> WordIndex:
+    """
+    Return the process-wide WordIndex, building it on first use.
+
+    The prebuilt lexicon file is preferred; the Brown corpus is only read
+    when the file is missing (see domain.utils.lexicon to build it).
+
+    Args:
+        retry_fallback: Try the lexicon and corpus again if the index was
+            built from the fallback list (warm-up retries pass True)
+
+    Returns:
+        WordIndex mapped from the lexicon file, built from the Brown corpus,
+        or built from a small fallback list if neither is available
+    """
+    global _word_index, _word_index_is_fallback  # pylint: disable=global-statement
+
+    def _needs_load() -> bool:
+        return _word_index is None or (retry_fallback and _word_index_is_fallback)
 
+    if _needs_load():
+        with _word_index_lock:
+            if _needs_load():
+                path = lexicon_path()
+                try:
+                    index = load_lexicon(path) if path.exists() else _load_brown_index()
+                    is_fallback = False
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.error("Error loading word index: %s", e)
+                    index = build_word_index(_FALLBACK_WORDS)
+                    is_fallback = True
+                _word_index = index
+                _word_index_is_fallback = is_fallback
 
-# Initialize corpus on module import
-_ensure_brown_corpus()
+    return _word_index
+
+
+def word_index_is_fallback() -> bool:
+    """Whether the loaded word index is the small fallback list, not real data."""
+    return _word_index_is_fallback
 
 
 def get_random_english_word() -> str:
@@ -50,26 +137,10 @@ def get_random_english_word() -> str:
     Original function by: uziellopez7
     """
     try:
-        word_list = [w for w in brown.words() if (len(w) > 3) and (w.isalpha())]
-        if not word_list:
-            raise ValueError("Brown corpus is empty")
-        return random.choice(word_list).lower()
-    except Exception as e:
-        print(f"Error accessing Brown corpus: {e}")
-        # Fallback to basic English words
-        fallback_words = [
-            "hello",
-            "world",
-            "python",
-            "computer",
-            "programming",
-            "developer",
-            "software",
-            "application",
-            "database",
-            "server",
-        ]
-        return random.choice(fallback_words)
+        return get_word_index().random_long_word()
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error("Error accessing Brown corpus: %s", e)
+        return random.choice(_FALLBACK_WORDS)
 
 
 def get_random_common_word(top_n: int = 1000) -> str:
@@ -85,17 +156,65 @@ def get_random_common_word(top_n: int = 1000) -> str:
     Original function by: uziellopez7
     """
     try:
-        frequency = Counter(w.lower() for w in brown.words() if w.isalpha())
-        common_words = [w for w, c in frequency.most_common(top_n) if w.isalpha()]
-        if not common_words:
+        index = get_word_index()
+        limit = min(top_n, len(index))
+        if limit <= 0:
             raise ValueError("No common words found")
-        return random.choice(common_words)
+        return index.words[random.randrange(limit)]
     except Exception as e:  # pylint: disable=broad-exception-caught
-        print(f"Error getting common words: {e}")
+        logger.error("Error getting common words: %s", e)
         # Fallback to basic words
         return get_random_english_word()
 
 
+def _band_range(index: WordIndex, difficulty: str) -> Tuple[int, int]:
+    """
+    Resolve a difficulty to a rank range clamped to the index size.
+
+    Falls back to the whole index when the band is empty (e.g. when only
+    the fallback word list is available).
+    """
+    start, end = index.bands.get(difficulty, DIFFICULTY_BANDS["medium"])
+    end = min(end, len(index))
+    if start >= end:
+        return 0, len(index)
+    return start, end
+
+
+def sample_words(
+    difficulty: str, k: int = 1, exclude: Optional[Iterable[str]] = None
+) -> List[str]:
+    """
+    Draw k distinct words from the rank band of a difficulty level.
+
+    Args:
+        difficulty: "easy" (ranks 0-100), "medium" (100-1000), "hard" (1000-5000)
+        k: Number of distinct words to draw
+        exclude: Words that must not be returned (e.g. already used in a session)
+
+    Returns:
+        List of k distinct words in random order
+
+    Raises:
+        ValueError: If the band holds fewer than k words outside exclude
+    """
+    index = get_word_index()
+    start, end = _band_range(index, difficulty)
+    excluded = set(exclude) if exclude else set()
+
+    # Each excluded word can knock out at most one drawn rank, so drawing
+    # k + len(excluded) distinct ranks is always enough
+    draws = min(end - start, k + len(excluded))
+    ranks = random.sample(range(start, end), draws)
+
+    words = [index.words[r] for r in ranks if index.words[r] not in excluded][:k]
+    if len(words) < k:
+        raise ValueError(
+            f"Only {len(words)} words available for difficulty '{difficulty}', requested {k}"
+        )
+    return words
+
+
 def get_word_by_difficulty(difficulty: str) -> str:
     """
     Get a word based on difficulty level using word frequency.
@@ -106,9 +225,6 @@ def get_word_by_difficulty(difficulty: str) -> str:
     Returns:
         Random word matching difficulty
 
-    Note: Built on top of get_random_common_word by uziellopez7
+    Note: Built on top of the WordIndex derived from uziellopez7's picker
     """
-    ranges = {"easy": 100, "medium": 1000, "hard": 5000}
-
-    top_n = ranges.get(difficulty, 1000)
-    return get_random_common_word(top_n)
+    return sample_words(difficulty, 1)[0]
@@ -1,26 +1,144 @@
 """
-Audio Cache - In-memory storage for audio challenges and audio data
+Audio Cache - Storage for audio challenges and audio data
+
+Synthesized clips are stored once, keyed by a hash of the synthesis inputs
+(see synthesis_key). Challenge options only point at those entries, so the
+same spoken text is never synthesized or stored twice. Processed encodings
+of a clip (see infrastructure.audio_processing) are stored beside it under
+encoding_key.
+
+Entries live in the store selected by CACHE_BACKEND (see
+infrastructure.cache_stores): per-process memory by default, or a SQLite
+database or key-value server shared by all workers so that any worker can
+serve a challenge generated by another.
 """
 
-from typing import Dict, Optional
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from infrastructure.audio_store import create_audio_store
+from infrastructure.cache_stores import AUDIO, CHALLENGES, LINKS, create_cache_store
+from infrastructure.challenge_ids import challenge_id_age
+from infrastructure.metrics import CACHE_LOOKUPS, CallbackMetric, register
+
+logger = logging.getLogger(__name__)
+
+# Byte budget for synthesized audio held in memory
+AUDIO_CACHE_MAX_BYTES = int(os.environ.get("AUDIO_CACHE_MAX_BYTES", "268435456"))
+AUDIO_CACHE_TTL_SECONDS = float(os.environ.get("AUDIO_CACHE_TTL_SECONDS", "86400"))
+# Entry budget for outstanding challenges
+CHALLENGE_CACHE_MAX_ENTRIES = int(os.environ.get("CHALLENGE_CACHE_MAX_ENTRIES", "10000"))
+CHALLENGE_CACHE_TTL_SECONDS = float(
+    os.environ.get("CHALLENGE_CACHE_TTL_SECONDS", "3600")
+)
+
+# Synthesized audio keyed by synthesis key, challenge option
+# ("{challenge_id}_{letter}") -> synthesis key, and challenge data by ID.
+# The limits bound the in-process tier of every backend.
+_store = create_cache_store(
+    {
+        AUDIO: {
+            "max_bytes": AUDIO_CACHE_MAX_BYTES,
+            "ttl_seconds": AUDIO_CACHE_TTL_SECONDS,
+        },
+        LINKS: {
+            "max_entries": 4 * CHALLENGE_CACHE_MAX_ENTRIES,
+            "ttl_seconds": CHALLENGE_CACHE_TTL_SECONDS,
+        },
+        CHALLENGES: {
+            "max_entries": CHALLENGE_CACHE_MAX_ENTRIES,
+            "ttl_seconds": CHALLENGE_CACHE_TTL_SECONDS,
+        },
+    }
+)
+# Optional persistent store for synthesized audio (AUDIO_STORE_DIR)
+_audio_store = create_audio_store()
+
+
+def _challenge_expired(challenge_id: int) -> bool:
+    """Whether a challenge is too old to be served, judged from its ID alone."""
+    return challenge_id_age(challenge_id) > CHALLENGE_CACHE_TTL_SECONDS
+
+
+def synthesis_key(spoken_text: str, lang: str, slow: bool, engine: str) -> str:
+    """
+    Build the content-addressed key for a synthesis request
+
+    Args:
+        spoken_text: Text sent to the TTS engine
+        lang: Language code
+        slow: Whether slow speech was requested
+        engine: Name of the TTS backend producing the audio
+
+    Returns:
+        Hex digest identifying the synthesized audio
+    """
+    payload = f"{engine}\0{lang}\0{int(slow)}\0{spoken_text}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def encoding_key(audio_key: str, encoding: str) -> str:
+    """Key of one processed encoding of a synthesized clip."""
+    return f"{audio_key}.{encoding}"
+
 
-# In-memory cache for audio data
-_audio_cache: Dict[str, bytes] = {}
-_challenge_cache: Dict[int, Dict] = {}
+def cache_synthesized_audio(audio_key: str, audio_bytes: bytes) -> None:
+    """
+    Cache synthesized audio under its synthesis key
+
+    Also writes the clip to the persistent audio store when one is configured.
+
+    Args:
+        audio_key: Key from synthesis_key
+        audio_bytes: Audio data as bytes
+    """
+    _store.put(AUDIO, audio_key, audio_bytes)
+    if _audio_store is not None:
+        _audio_store.put(audio_key, audio_bytes)
+
+
+def get_synthesized_audio(audio_key: str) -> Optional[bytes]:
+    """
+    Retrieve synthesized audio by synthesis key
+
+    Args:
+        audio_key: Key from synthesis_key
+
+    Returns:
+        Audio bytes or None if not synthesized yet
+    """
+    audio_data = _load_audio(audio_key)
+    CACHE_LOOKUPS.inc(cache="synthesis", result="miss" if audio_data is None else "hit")
+    return audio_data
+
+
+def _load_audio(key: str) -> Optional[bytes]:
+    audio_data = _store.get(AUDIO, key)
+
+    if audio_data is None and _audio_store is not None:
+        # Clips synthesized before a restart are still on disk
+        audio_data = _audio_store.get(key)
+        if audio_data is not None:
+            _store.put(AUDIO, key, audio_data)
+
+    return audio_data
 
 
-def cache_audio(challenge_id: int, option_letter: str, audio_bytes: bytes) -> None:
+def cache_audio(challenge_id: int, option_letter: str, audio_key: str) -> None:
     """
-    Cache audio data for a challenge option
+    Point a challenge option at a synthesized audio entry
 
     Args:
         challenge_id: Challenge ID
         option_letter: Option letter (A, B, C, D)
-        audio_bytes: Audio data as bytes
+        audio_key: Synthesis key of the option's audio
     """
     cache_key = f"{challenge_id}_{option_letter}"
-    _audio_cache[cache_key] = audio_bytes
-    print(f"Cached audio for {cache_key} ({len(audio_bytes)} bytes)")
+    _store.put(LINKS, cache_key, audio_key)
+    logger.debug("Cached audio for %s -> %s", cache_key, audio_key[:12])
 
 
 def cache_challenge(challenge_id: int, data: Dict) -> None:
@@ -31,32 +149,78 @@ def cache_challenge(challenge_id: int, data: Dict) -> None:
         challenge_id: Challenge ID
         data: Challenge data dictionary
     """
-    _challenge_cache[challenge_id] = data
-    print(f"Cached challenge {challenge_id}")
+    _store.put(CHALLENGES, str(challenge_id), data)
+    logger.debug("Cached challenge %s", challenge_id)
 
 
-def get_cached_audio(challenge_id: int, option_letter: str) -> Optional[bytes]:
+def get_cached_audio(
+    challenge_id: int, option_letter: str, encodings: Sequence[str] = ()
+) -> Optional[bytes]:
     """
     Retrieve cached audio
 
     Args:
         challenge_id: Challenge ID
         option_letter: Option letter (A, B, C, D)
+        encodings: Processed encodings to look for, in order of preference;
+            the original clip is returned when none of them is stored
 
     Returns:
         Audio bytes or None if not found
     """
     cache_key = f"{challenge_id}_{option_letter}"
-    audio_data = _audio_cache.get(cache_key)
-
-    if audio_data:
-        print(f"Retrieved cached audio for {cache_key}")
+    if _challenge_expired(challenge_id):
+        audio_key = None
     else:
-        print(f"No cached audio found for {cache_key}")
+        audio_key = _store.get(LINKS, cache_key)
+
+    audio_data = None
+    if audio_key:
+        for encoding in encodings:
+            audio_data = _load_audio(encoding_key(audio_key, encoding))
+            if audio_data is not None:
+                break
+        else:
+            audio_data = get_synthesized_audio(audio_key)
+
+    result = "hit" if audio_data else "miss"
+    CACHE_LOOKUPS.inc(cache="audio", result=result)
+    logger.debug("Audio cache %s for %s", result, cache_key)
 
     return audio_data
 
 
+def get_cached_audio_path(
+    challenge_id: int, option_letter: str, encodings: Sequence[str] = ()
+) -> Optional[Path]:
+    """
+    Locate a challenge option's audio in the persistent audio store
+
+    Lets the API serve the file directly instead of copying it through memory.
+
+    Args:
+        challenge_id: Challenge ID
+        option_letter: Option letter (A, B, C, D)
+        encodings: Processed encodings to look for, in order of preference;
+            the original clip is used when none of them is stored
+
+    Returns:
+        Path to the audio file or None if there is no store or no file
+    """
+    if _audio_store is None or _challenge_expired(challenge_id):
+        return None
+
+    audio_key = _store.get(LINKS, f"{challenge_id}_{option_letter}")
+    if not audio_key:
+        return None
+
+    for encoding in encodings:
+        path = _audio_store.get_path(encoding_key(audio_key, encoding))
+        if path is not None:
+            return path
+    return _audio_store.get_path(audio_key)
+
+
 def get_cached_challenge(challenge_id: int) -> Optional[Dict]:
     """
     Retrieve cached challenge data
@@ -65,14 +229,16 @@ def get_cached_challenge(challenge_id: int) -> Optional[Dict]:
         challenge_id: Challenge ID
 
     Returns:
-        Challenge data dictionary or None if not found
+        Challenge data dictionary or None if not found or expired
     """
-    challenge_data = _challenge_cache.get(challenge_id)
-
-    if challenge_data:
-        print(f"Retrieved cached challenge {challenge_id}")
+    if _challenge_expired(challenge_id):
+        challenge_data = None
     else:
-        print(f"No cached challenge found for {challenge_id}")
+        challenge_data = _store.get(CHALLENGES, str(challenge_id))
+
+    result = "hit" if challenge_data else "miss"
+    CACHE_LOOKUPS.inc(cache="challenge", result=result)
+    logger.debug("Challenge cache %s for %s", result, challenge_id)
 
     return challenge_data
 
@@ -81,16 +247,17 @@ def clear_audio_cache() -> None:
     """
     Clear all cached audio data
     """
-    _audio_cache.clear()
-    print("Cleared audio cache")
+    _store.clear(LINKS)
+    _store.clear(AUDIO)
+    logger.info("Cleared audio cache")
 
 
 def clear_challenge_cache() -> None:
     """
     Clear all cached challenge data
     """
-    _challenge_cache.clear()
-    print("Cleared challenge cache")
+    _store.clear(CHALLENGES)
+    logger.info("Cleared challenge cache")
 
 
 def clear_all_caches() -> None:
@@ -99,21 +266,97 @@ def clear_all_caches() -> None:
     """
     clear_audio_cache()
     clear_challenge_cache()
-    print("Cleared all caches")
+    logger.info("Cleared all caches")
+
+
+def claim_lease(name: str, owner: str, ttl_seconds: float) -> bool:
+    """
+    Take or renew a lease exclusive among all processes sharing the cache.
+
+    See CacheStore.claim_lease; with the memory backend the lease is
+    exclusive among the processes on this host.
+
+    Returns:
+        Whether owner holds the lease
+    """
+    return _store.claim_lease(name, owner, ttl_seconds)
+
+
+def scan_cache_keys(
+    namespace: str, cursor: str = "", limit: int = 100, prefix: str = ""
+) -> Tuple[List[str], Optional[str]]:
+    """
+    List one page of the keys held in a cache namespace (debugging only)
+
+    Args:
+        namespace: "audio", "links" or "challenges"
+        cursor: Cursor returned with the previous page ("" for the first)
+        limit: Maximum number of keys
+        prefix: Only list keys starting with this string
+
+    Returns:
+        (keys in sorted order, cursor for the next page or None at the end)
+    """
+    keys = _store.scan(namespace, cursor, limit, prefix)
+    next_cursor = keys[-1] if len(keys) == limit else None
+    return keys, next_cursor
 
 
 def get_cache_stats() -> Dict:
     """
     Get statistics about cached data
 
+    Reads counters the stores maintain incrementally, so the cost does not
+    grow with the number of cached entries.
+
     Returns:
         Dict with cache statistics
     """
-    total_audio_size = sum(len(audio) for audio in _audio_cache.values())
+    stats = _store.stats()
+    total_audio_size = stats[AUDIO]["bytes"]
 
     return {
-        "audio_entries": len(_audio_cache),
-        "challenge_entries": len(_challenge_cache),
+        "backend": _store.name,
+        "audio_entries": stats[LINKS]["entries"],
+        "synthesized_entries": stats[AUDIO]["entries"],
+        "challenge_entries": stats[CHALLENGES]["entries"],
         "total_audio_bytes": total_audio_size,
         "total_audio_mb": round(total_audio_size / (1024 * 1024), 2),
+        "audio_budget_bytes": AUDIO_CACHE_MAX_BYTES,
+        "audio_evictions": stats[AUDIO]["evictions"],
+        "challenge_evictions": stats[CHALLENGES]["evictions"],
     }
+
+
+def _store_metric(field: str) -> Dict:
+    stats = _store.stats()
+    return {(namespace,): counters.get(field, 0) for namespace, counters in stats.items()}
+
+
+register(
+    CallbackMetric(
+        "cache_entries",
+        "Entries per cache namespace",
+        "gauge",
+        lambda: _store_metric("entries"),
+        ["namespace"],
+    )
+)
+register(
+    CallbackMetric(
+        "cache_bytes",
+        "Bytes of audio held per cache namespace",
+        "gauge",
+        lambda: _store_metric("bytes"),
+        ["namespace"],
+    )
+)
+register(
+    CallbackMetric(
+        "cache_evictions_total",
+        "Entries evicted to stay within cache budgets",
+        "counter",
+        lambda: _store_metric("evictions"),
+        ["namespace"],
+    )
+)
@@ -0,0 +1,284 @@
+"""
+Audio Processing - Post-synthesis cleanup and compact encodings via ffmpeg
+
+TTS engines return clips with leading and trailing silence and uneven
+loudness. Each new clip is run through ffmpeg once to trim the silence,
+normalize loudness (EBU R128) and encode it in every available tier:
+
+    standard      MP3, the default served to every client
+    compact       Low-bitrate MP3 for slow or metered connections
+    compact-opus  Low-bitrate Opus in Ogg, for clients that accept audio/ogg
+
+Encodings are stored next to the original clip (see audio_cache), and
+select_encodings() picks the ones to serve for a request. Without ffmpeg,
+or with AUDIO_PROCESSING=off, no encodings are produced and the original
+clip is served unchanged.
+
+Settings (environment variables):
+    AUDIO_PROCESSING          auto | off (default: auto, on when ffmpeg is found)
+    FFMPEG_PATH               ffmpeg executable (default: ffmpeg on PATH)
+    AUDIO_LOUDNESS_LUFS       Integrated loudness target (default: -16)
+    AUDIO_STANDARD_BITRATE    Bitrate of the standard tier (default: 32k, gTTS's own)
+    AUDIO_COMPACT_BITRATE     Bitrate of the compact tiers (default: 24k)
+    AUDIO_PROCESSING_TIMEOUT  Seconds before an ffmpeg run is abandoned (default: 10)
+"""
+
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from infrastructure.metrics import Counter, register
+
+logger = logging.getLogger(__name__)
+
+AUDIO_PROCESSING = os.environ.get("AUDIO_PROCESSING", "auto").lower()
+FFMPEG_PATH = os.environ.get("FFMPEG_PATH", "ffmpeg")
+AUDIO_LOUDNESS_LUFS = float(os.environ.get("AUDIO_LOUDNESS_LUFS", "-16"))
+AUDIO_STANDARD_BITRATE = os.environ.get("AUDIO_STANDARD_BITRATE", "32k")
+AUDIO_COMPACT_BITRATE = os.environ.get("AUDIO_COMPACT_BITRATE", "24k")
+AUDIO_PROCESSING_TIMEOUT = float(os.environ.get("AUDIO_PROCESSING_TIMEOUT", "10"))
+
+# Quality tiers a client can ask for; "original" is the unprocessed clip
+QUALITIES = ("standard", "compact", "original")
+DEFAULT_QUALITY = "standard"
+
+# Silence below this level is trimmed, keeping a short lead-in so the first
+# consonant is not clipped
+_SILENCE = "silenceremove=start_periods=1:start_threshold=-50dB:start_silence=0.05"
+
+AUDIO_PROCESSING_ERRORS = register(
+    Counter(
+        "audio_processing_errors_total",
+        "Clips that could not be processed and are served unprocessed",
+    )
+)
+
+
+class Encoding(NamedTuple):
+    """One stored encoding of a processed clip."""
+
+    quality: str
+    media_type: str
+    encoder: str
+    # ffmpeg output options
+    options: Tuple[str, ...]
+
+
+ENCODINGS: Dict[str, Encoding] = {
+    "standard": Encoding(
+        "standard",
+        "audio/mpeg",
+        "libmp3lame",
+        ("-ac", "1", "-ar", "24000", "-b:a", AUDIO_STANDARD_BITRATE, "-f", "mp3"),
+    ),
+    "compact": Encoding(
+        "compact",
+        "audio/mpeg",
+        "libmp3lame",
+        ("-ac", "1", "-ar", "16000", "-b:a", AUDIO_COMPACT_BITRATE, "-f", "mp3"),
+    ),
+    "compact-opus": Encoding(
+        "compact",
+        "audio/ogg",
+        "libopus",
+        (
+            "-ac", "1", "-ar", "16000", "-b:a", AUDIO_COMPACT_BITRATE,
+            "-application", "voip", "-f", "ogg",
+        ),
+    ),
+}  # fmt: skip
+
+
+@lru_cache(maxsize=1)
+def available_encodings() -> Tuple[str, ...]:
+    """
+    Encodings this host can produce, detected once per process.
+
+    Returns:
+        Names from ENCODINGS whose encoder the ffmpeg build includes (empty
+        when processing is off or ffmpeg is missing)
+    """
+    if AUDIO_PROCESSING == "off":
+        return ()
+
+    ffmpeg = shutil.which(FFMPEG_PATH)
+    if ffmpeg is None:
+        logger.info("ffmpeg not found; audio clips are served unprocessed")
+        return ()
+
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-encoders"],
+            capture_output=True,
+            text=True,
+            timeout=AUDIO_PROCESSING_TIMEOUT,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning("Could not query ffmpeg encoders: %s", e)
+        return ()
+
+    encoders = {
+        line.split()[1] for line in result.stdout.splitlines() if len(line.split()) > 1
+    }
+    names = tuple(name for name, enc in ENCODINGS.items() if enc.encoder in encoders)
+    logger.info("Audio processing enabled with encodings: %s", ", ".join(names))
+    return names
+
+
+def _filter_graph(outputs: int) -> str:
+    """Trim both ends (by trimming the reversed clip), normalize, split per output."""
+    chain = ",".join(
+        [
+            _SILENCE,
+            "areverse",
+            _SILENCE,
+            "areverse",
+            f"loudnorm=I={AUDIO_LOUDNESS_LUFS}:TP=-1.5:LRA=11",
+        ]
+    )
+    labels = "".join(f"[out{i}]" for i in range(outputs))
+    return f"[0:a]{chain},asplit={outputs}{labels}"
+
+
+def process_audio(audio: bytes) -> Dict[str, bytes]:
+    """
+    Trim, normalize and encode a clip in every available encoding.
+
+    All encodings come from a single ffmpeg run, so the clip is decoded and
+    filtered once.
+
+    Args:
+        audio: Clip as produced by the TTS backend (any format ffmpeg reads)
+
+    Returns:
+        Encoding name -> encoded bytes, leaving out encodings no smaller
+        than the clip itself; empty if processing is unavailable or failed.
+        The original clip is served in place of any missing encoding.
+    """
+    names = available_encodings()
+    if not names or not audio:
+        return {}
+
+    with tempfile.TemporaryDirectory(prefix="audio-") as tmp_dir:
+        outputs: List[Path] = [Path(tmp_dir) / f"out{i}" for i in range(len(names))]
+        command = [
+            shutil.which(FFMPEG_PATH) or FFMPEG_PATH,
+            "-hide_banner", "-loglevel", "error", "-nostdin",
+            "-i", "pipe:0",
+            "-filter_complex", _filter_graph(len(names)),
+        ]  # fmt: skip
+        for i, name in enumerate(names):
+            encoding = ENCODINGS[name]
+            command += ["-map", f"[out{i}]", "-c:a", encoding.encoder]
+            command += [*encoding.options, str(outputs[i])]
+
+        try:
+            subprocess.run(
+                command,
+                input=audio,
+                capture_output=True,
+                timeout=AUDIO_PROCESSING_TIMEOUT,
+                check=True,
+            )
+            encoded = {name: path.read_bytes() for name, path in zip(names, outputs)}
+        except subprocess.CalledProcessError as e:
+            AUDIO_PROCESSING_ERRORS.inc()
+            logger.warning(
+                "ffmpeg failed: %s", e.stderr.decode("utf-8", "replace").strip()
+            )
+            return {}
+        except (OSError, subprocess.SubprocessError) as e:
+            AUDIO_PROCESSING_ERRORS.inc()
+            logger.warning("Audio processing failed: %s", e)
+            return {}
+
+    # An empty result means everything was trimmed; keep the original
+    if not all(encoded.values()):
+        AUDIO_PROCESSING_ERRORS.inc()
+        return {}
+    # A re-encode that saves nothing only costs quality
+    return {name: data for name, data in encoded.items() if len(data) < len(audio)}
+
+
+def _accept_quality(accept: str, media_type: str) -> Tuple[float, bool]:
+    """
+    q-value the Accept header gives a media type (most specific range wins)
+
+    Returns:
+        (q-value, whether the media type is named explicitly)
+    """
+    main_type = media_type.split("/")[0]
+    best = (-1, 0.0)
+    for item in accept.split(","):
+        range_text, *params = item.strip().split(";")
+        range_text = range_text.strip().lower()
+        if range_text == media_type:
+            specificity = 2
+        elif range_text == f"{main_type}/*":
+            specificity = 1
+        elif range_text == "*/*":
+            specificity = 0
+        else:
+            continue
+
+        q = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        best = max(best, (specificity, q))
+    return best[1], best[0] == 2
+
+
+def select_encodings(
+    quality: Optional[str] = None,
+    accept: Optional[str] = None,
+    save_data: Optional[str] = None,
+) -> Tuple[str, ...]:
+    """
+    Choose the encodings to serve, in order of preference.
+
+    The tier comes from the quality query parameter, else from a
+    "Save-Data: on" client hint (compact), else DEFAULT_QUALITY. Within the
+    tier, the Accept header decides between formats: Opus is only sent to
+    clients that name audio/ogg and rank it at least as high as audio/mpeg.
+
+    Args:
+        quality: Requested tier ("standard", "compact" or "original")
+        accept: Value of the Accept header
+        save_data: Value of the Save-Data header
+
+    Returns:
+        Encoding names to try in order; the original clip is the fallback
+        when none of them is stored (empty for "original")
+    """
+    if quality is None:
+        on = (save_data or "").strip().lower() == "on"
+        quality = "compact" if on else DEFAULT_QUALITY
+    if quality not in QUALITIES:
+        raise ValueError(f"Quality must be one of {', '.join(QUALITIES)}")
+
+    candidates = [name for name, enc in ENCODINGS.items() if enc.quality == quality]
+    mp3 = [name for name in candidates if ENCODINGS[name].media_type == "audio/mpeg"]
+    if not accept:
+        return tuple(mp3)
+
+    # MP3 plays everywhere, so a wildcard alone never selects another format
+    mp3_q, _ = _accept_quality(accept, "audio/mpeg")
+    preferred = []
+    for name in candidates:
+        media_type = ENCODINGS[name].media_type
+        if media_type != "audio/mpeg":
+            q, explicit = _accept_quality(accept, media_type)
+            if explicit and q > 0 and q >= mp3_q:
+                preferred.append(name)
+    return tuple(preferred + mp3)
@@ -0,0 +1,80 @@
+"""
+Audio Store - Persistent, content-addressed storage for synthesized audio
+
+Clips are written once under their synthesis key and never modified, so
+they survive restarts and deploys and can be served straight from disk.
+The set of clips is bounded by the vocabulary (word x variant), which
+keeps the directory from growing without limit.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+
+class DiskAudioStore:
+    """Directory of audio files named by synthesis key."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, audio_key: str) -> Path:
+        """Location of a clip, fanned out by key prefix to keep directories small."""
+        return self.root / audio_key[:2] / audio_key
+
+    def get_path(self, audio_key: str) -> Optional[Path]:
+        """
+        Path of a stored clip
+
+        Returns:
+            Path to the file or None if the clip is not stored
+        """
+        path = self.path_for(audio_key)
+        return path if path.is_file() else None
+
+    def get(self, audio_key: str) -> Optional[bytes]:
+        """
+        Read a stored clip
+
+        Returns:
+            Audio bytes or None if the clip is not stored
+        """
+        try:
+            return self.path_for(audio_key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, audio_key: str, audio_bytes: bytes) -> None:
+        """
+        Store a clip atomically; existing clips are left untouched.
+
+        Args:
+            audio_key: Synthesis key of the clip
+            audio_bytes: Audio data as bytes
+        """
+        path = self.path_for(audio_key)
+        if path.exists():
+            return
+
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio_bytes)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def create_audio_store() -> Optional[DiskAudioStore]:
+    """
+    Create the disk store configured by AUDIO_STORE_DIR.
+
+    Returns:
+        DiskAudioStore, or None when AUDIO_STORE_DIR is not set
+    """
+    root = os.environ.get("AUDIO_STORE_DIR")
+    return DiskAudioStore(Path(root)) if root else None
@@ -0,0 +1,176 @@
+"""
+Bounded Cache - Thread-safe LRU cache with TTL, entry and byte budgets
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+
+class BoundedCache:
+    """
+    Least-recently-used cache that stays within fixed limits.
+
+    Entries are evicted oldest-use first once either budget is exceeded and
+    expire ttl_seconds after they were stored. All operations take a single
+    lock, so synthesis threads and request handlers can share one instance.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        size_of: Callable[[Any], int] = lambda value: 0,
+    ):
+        """
+        Args:
+            max_entries: Maximum number of entries (None for unlimited)
+            max_bytes: Maximum total size as measured by size_of (None for unlimited)
+            ttl_seconds: Lifetime of an entry after it is stored (None for no expiry)
+            size_of: Function returning the size of a value in bytes
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._size_of = size_of
+        # key -> (value, size, expires_at)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # str(key) of every entry, sorted, so scan pages cost O(log n + limit)
+        self._sorted_keys: List[str] = []
+        self._lock = threading.Lock()
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the value for key and mark it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            if entry[2] is not None and entry[2] <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting least recently used entries if over budget."""
+        size = self._size_of(value)
+        now = time.monotonic()
+        expires_at = now + self.ttl_seconds if self.ttl_seconds is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, expires_at)
+            insort(self._sorted_keys, str(key))
+            self._total_bytes += size
+            self._purge_expired_head(now)
+            self._evict_over_budget()
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._sorted_keys.clear()
+            self._total_bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        """Snapshot of the keys, least recently used first."""
+        with self._lock:
+            return list(self._entries.keys())
+
+    def scan(self, after: str = "", limit: int = 100, prefix: str = "") -> List[str]:
+        """
+        One page of keys in sorted order.
+
+        Binary search over the sorted key index: O(log n + limit) per page.
+
+        Args:
+            after: Only return keys sorting after this one (the previous
+                page's last key)
+            limit: Maximum number of keys
+            prefix: Only return keys starting with this string
+
+        Returns:
+            Up to limit keys, sorted
+        """
+        with self._lock:
+            keys = self._sorted_keys
+            # Keys with the prefix form one contiguous run of the index
+            if prefix > after:
+                start = bisect_left(keys, prefix)
+            else:
+                start = bisect_right(keys, after)
+
+            page: List[str] = []
+            for key in keys[start : start + limit]:
+                if not key.startswith(prefix):
+                    break
+                page.append(key)
+            return page
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        """Total size of the stored values."""
+        return self._total_bytes
+
+    def stats(self) -> Dict[str, int]:
+        """Counters describing cache size and effectiveness."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self._total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    # Helpers below expect self._lock to be held
+
+    def _remove(self, key: Hashable) -> Any:
+        value, size, _ = self._entries.pop(key)
+        self._total_bytes -= size
+        del self._sorted_keys[bisect_left(self._sorted_keys, str(key))]
+        return value
+
+    def _purge_expired_head(self, now: float) -> None:
+        """Drop expired entries from the least recently used end."""
+        while self._entries:
+            key, (_, _, expires_at) = next(iter(self._entries.items()))
+            if expires_at is None or expires_at > now:
+                break
+            self._remove(key)
+            self.expirations += 1
+
+    def _evict_over_budget(self) -> None:
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
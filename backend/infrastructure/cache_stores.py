@@ -0,0 +1,523 @@
+"""
+Cache Stores - Pluggable storage backends for infrastructure.audio_cache
+
+audio_cache keeps three namespaces of entries:
+    audio       synthesis key -> synthesized clip (bytes)
+    links       "{challenge_id}_{letter}" -> synthesis key (str)
+    challenges  challenge ID -> challenge data (dict)
+
+Backends (CACHE_BACKEND):
+    memory  Bounded in-process LRU caches (default; one copy per worker)
+    sqlite  SQLite database in WAL mode shared by every worker on the host
+            (CACHE_SQLITE_PATH)
+    kv      Network key-value server shared by every node (CACHE_KV_URL);
+            infrastructure.kv_server is a local stand-in
+
+The shared backends sit behind a small in-process cache. Entries are never
+modified after they are written, so the local copies cannot go stale.
+
+Every backend also grants named leases (claim_lease), which are exclusive
+among all processes sharing the store; challenge_ids leases its worker
+numbers this way.
+"""
+
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from infrastructure.bounded_cache import BoundedCache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+AUDIO = "audio"
+LINKS = "links"
+CHALLENGES = "challenges"
+NAMESPACES = (AUDIO, LINKS, CHALLENGES)
+
+
+def encode_value(namespace: str, value: Any) -> bytes:
+    """Serialize a namespace value for a shared backend."""
+    if namespace == AUDIO:
+        return value
+    if namespace == LINKS:
+        return value.encode("utf-8")
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def decode_value(namespace: str, data: bytes) -> Any:
+    """Inverse of encode_value."""
+    if namespace == AUDIO:
+        return bytes(data)
+    if namespace == LINKS:
+        return bytes(data).decode("utf-8")
+    return json.loads(data)
+
+
+def _try_lock_file(path: str) -> Optional[int]:
+    """
+    Open and exclusively lock a file without blocking.
+
+    Returns:
+        File descriptor holding the lock (released by the OS when the
+        process exits), or None if another process holds it
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+class CacheStore:
+    """Base class for audio_cache storage backends."""
+
+    name = "base"
+
+    def get(self, namespace: str, key: str) -> Any:
+        """Return the value stored under key, or None."""
+        raise NotImplementedError
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        """Store a value under key."""
+        raise NotImplementedError
+
+    def clear(self, namespace: str) -> None:
+        """Remove every entry of a namespace."""
+        raise NotImplementedError
+
+    def scan(
+        self, namespace: str, after: str = "", limit: int = 100, prefix: str = ""
+    ) -> List[str]:
+        """
+        One page of a namespace's keys in sorted order (debugging only).
+
+        Args:
+            namespace: Namespace to list
+            after: Only return keys sorting after this one
+            limit: Maximum number of keys
+            prefix: Only return keys starting with this string
+        """
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Per-namespace counters: entries, bytes and evictions at least.
+
+        Counters are maintained as entries come and go, so this must not
+        depend on the number of entries stored.
+        """
+        raise NotImplementedError
+
+    def claim_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        """
+        Take or renew a named lease, atomically.
+
+        Args:
+            name: Lease name
+            owner: Identifier unique to the claiming process
+            ttl_seconds: Time the lease is held unless renewed
+
+        Returns:
+            True if owner now holds the lease (it was free, expired or
+            already owner's), False if another owner holds it
+        """
+        raise NotImplementedError
+
+
+class MemoryCacheStore(CacheStore):
+    """Bounded, thread-safe LRU caches private to this process."""
+
+    name = "memory"
+
+    def __init__(
+        self, limits: Dict[str, Dict[str, Any]], lock_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            limits: Per-namespace BoundedCache keyword arguments
+                (max_entries, max_bytes, ttl_seconds)
+            lock_dir: Directory for lease lock files, shared by every process
+                on the host (default: under the system temp dir)
+        """
+        self._caches = {
+            namespace: BoundedCache(
+                size_of=len if namespace == AUDIO else lambda value: 0,
+                **limits.get(namespace, {}),
+            )
+            for namespace in NAMESPACES
+        }
+        self.lock_dir = lock_dir or os.path.join(
+            tempfile.gettempdir(), "pronunciation-coach-leases"
+        )
+        # Lease name -> descriptor holding its lock file
+        self._lease_fds: Dict[str, int] = {}
+        self._lease_pid = os.getpid()
+        self._lease_lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Any:
+        return self._caches[namespace].get(key)
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self._caches[namespace].put(key, value)
+
+    def clear(self, namespace: str) -> None:
+        self._caches[namespace].clear()
+
+    def scan(
+        self, namespace: str, after: str = "", limit: int = 100, prefix: str = ""
+    ) -> List[str]:
+        return self._caches[namespace].scan(after, limit, prefix)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {namespace: cache.stats() for namespace, cache in self._caches.items()}
+
+    def claim_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        # Nothing here is shared beyond this host, so a lease only has to be
+        # exclusive among its processes: an exclusive lock file, held until
+        # the process exits (ttl_seconds does not apply)
+        with self._lease_lock:
+            if self._lease_pid != os.getpid():
+                # After a fork the inherited descriptors are the parent's locks
+                self._lease_fds = {}
+                self._lease_pid = os.getpid()
+            if name in self._lease_fds:
+                return True
+
+            os.makedirs(self.lock_dir, exist_ok=True)
+            fd = _try_lock_file(os.path.join(self.lock_dir, f"{name}.lock"))
+            if fd is None:
+                return False
+            self._lease_fds[name] = fd
+            return True
+
+
+class SQLiteCacheStore(CacheStore):
+    """
+    SQLite database in WAL mode, shared by all worker processes on a host.
+
+    Expired entries are skipped on read and purged periodically on write.
+    Entry and byte totals live in a counters table kept up to date by
+    triggers, so stats() reads one row per namespace.
+    """
+
+    name = "sqlite"
+
+    # Writes between purges of expired entries
+    PURGE_INTERVAL = 256
+
+    def __init__(self, path: str, ttl_seconds: Dict[str, Optional[float]]):
+        """
+        Args:
+            path: Database file path
+            ttl_seconds: Per-namespace entry lifetime (None for no expiry)
+        """
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " expires_at REAL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._create_counters(conn)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS leases ("
+            " name TEXT PRIMARY KEY,"
+            " owner TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+
+    @staticmethod
+    def _create_counters(conn: sqlite3.Connection) -> None:
+        """Create the counters table and its triggers, backfilling existing data."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'counters'"
+        ).fetchone()
+        if exists:
+            return
+
+        conn.execute(
+            "CREATE TABLE counters ("
+            " namespace TEXT PRIMARY KEY,"
+            " entries INTEGER NOT NULL DEFAULT 0,"
+            " bytes INTEGER NOT NULL DEFAULT 0,"
+            " expirations INTEGER NOT NULL DEFAULT 0)"
+        )
+        conn.executemany(
+            "INSERT INTO counters (namespace) VALUES (?)",
+            [(namespace,) for namespace in NAMESPACES],
+        )
+        conn.execute(
+            "UPDATE counters SET"
+            " entries = (SELECT COUNT(*) FROM entries"
+            "  WHERE entries.namespace = counters.namespace),"
+            " bytes = (SELECT COALESCE(SUM(size), 0) FROM entries"
+            "  WHERE entries.namespace = counters.namespace)"
+        )
+        conn.executescript(
+            """
+            CREATE TRIGGER entries_insert AFTER INSERT ON entries BEGIN
+                UPDATE counters SET entries = entries + 1, bytes = bytes + new.size
+                WHERE namespace = new.namespace;
+            END;
+            CREATE TRIGGER entries_delete AFTER DELETE ON entries BEGIN
+                UPDATE counters SET entries = entries - 1, bytes = bytes - old.size
+                WHERE namespace = old.namespace;
+            END;
+            CREATE TRIGGER entries_update AFTER UPDATE OF size ON entries BEGIN
+                UPDATE counters SET bytes = bytes + new.size - old.size
+                WHERE namespace = new.namespace;
+            END;
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not shareable."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> Any:
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (namespace, key, time.time()),
+        ).fetchone()
+        return decode_value(namespace, row[0]) if row else None
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        data = encode_value(namespace, value)
+        ttl = self.ttl_seconds.get(namespace)
+        expires_at = time.time() + ttl if ttl is not None else None
+
+        conn = self._connection()
+        with conn:
+            # An upsert rather than INSERT OR REPLACE: REPLACE's implicit
+            # delete does not fire the counter triggers
+            conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (namespace, key) DO UPDATE SET"
+                " value = excluded.value, size = excluded.size,"
+                " expires_at = excluded.expires_at",
+                (namespace, key, sqlite3.Binary(data), len(data), expires_at),
+            )
+
+        with self._writes_lock:
+            self._writes += 1
+            purge = self._writes % self.PURGE_INTERVAL == 0
+        if purge:
+            self._purge_expired(conn)
+
+    @staticmethod
+    def _purge_expired(conn: sqlite3.Connection) -> None:
+        with conn:
+            rows = conn.execute(
+                "SELECT namespace, COUNT(*) FROM entries WHERE expires_at <= ?"
+                " GROUP BY namespace",
+                (time.time(),),
+            ).fetchall()
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (time.time(),))
+            conn.executemany(
+                "UPDATE counters SET expirations = expirations + ? WHERE namespace = ?",
+                [(count, namespace) for namespace, count in rows],
+            )
+
+    def clear(self, namespace: str) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+
+    def scan(
+        self, namespace: str, after: str = "", limit: int = 100, prefix: str = ""
+    ) -> List[str]:
+        # A key range rather than LIKE so the primary key index is used
+        query = "SELECT key FROM entries WHERE namespace = ? AND key > ?"
+        params: list = [namespace, after]
+        if prefix:
+            query += " AND key >= ? AND key < ?"
+            params += [prefix, prefix + "\U0010ffff"]
+        query += " ORDER BY key LIMIT ?"
+        params.append(limit)
+        return [row[0] for row in self._connection().execute(query, params)]
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        rows = self._connection().execute(
+            "SELECT namespace, entries, bytes, expirations FROM counters"
+        )
+        return {
+            namespace: {
+                "entries": entries,
+                "bytes": size if namespace == AUDIO else 0,
+                # Shared entries only leave by expiring
+                "evictions": 0,
+                "expirations": expirations,
+            }
+            for namespace, entries, size, expirations in rows
+        }
+
+    def claim_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            # Take the lease if it is free, expired or already ours
+            conn.execute(
+                "INSERT INTO leases VALUES (?, ?, ?)"
+                " ON CONFLICT (name) DO UPDATE SET"
+                " owner = excluded.owner, expires_at = excluded.expires_at"
+                " WHERE leases.owner = excluded.owner OR leases.expires_at <= ?",
+                (name, owner, now + ttl_seconds, now),
+            )
+            row = conn.execute(
+                "SELECT owner FROM leases WHERE name = ?", (name,)
+            ).fetchone()
+        return row is not None and row[0] == owner
+
+
+class KeyValueCacheStore(CacheStore):
+    """
+    Client for a network key-value server shared by all nodes.
+
+    Speaks a minimal HTTP protocol (see infrastructure.kv_server):
+        GET    /kv/{namespace}/{key}     200 with the value, or 404
+        PUT    /kv/{namespace}/{key}     store the request body
+        DELETE /kv/{namespace}           clear a namespace
+        GET    /kv/{namespace}           JSON page of sorted keys
+                                         (?after=&limit=&prefix=)
+        GET    /stats                    JSON per-namespace counters
+        POST   /leases/{name}            take or renew a lease (JSON owner and
+                                         ttl_seconds); 200, or 409 if held
+    """
+
+    name = "kv"
+
+    def __init__(self, base_url: str, timeout: float = 2.0):
+        import httpx  # pylint: disable=import-outside-toplevel
+
+        self._client = httpx.Client(base_url=base_url, timeout=timeout)
+
+    def get(self, namespace: str, key: str) -> Any:
+        response = self._client.get(f"/kv/{namespace}/{key}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return decode_value(namespace, response.content)
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        response = self._client.put(
+            f"/kv/{namespace}/{key}", content=encode_value(namespace, value)
+        )
+        response.raise_for_status()
+
+    def clear(self, namespace: str) -> None:
+        self._client.delete(f"/kv/{namespace}").raise_for_status()
+
+    def scan(
+        self, namespace: str, after: str = "", limit: int = 100, prefix: str = ""
+    ) -> List[str]:
+        response = self._client.get(
+            f"/kv/{namespace}", params={"after": after, "limit": limit, "prefix": prefix}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        response = self._client.get("/stats")
+        response.raise_for_status()
+        return response.json()
+
+    def claim_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        response = self._client.post(
+            f"/leases/{name}", json={"owner": owner, "ttl_seconds": ttl_seconds}
+        )
+        if response.status_code == 409:
+            return False
+        response.raise_for_status()
+        return True
+
+
+class TieredCacheStore(CacheStore):
+    """Shared backend with a bounded in-process read-through cache in front."""
+
+    def __init__(self, local: MemoryCacheStore, shared: CacheStore):
+        self.local = local
+        self.shared = shared
+        self.name = shared.name
+
+    def get(self, namespace: str, key: str) -> Any:
+        value = self.local.get(namespace, key)
+        if value is None:
+            value = self.shared.get(namespace, key)
+            if value is not None:
+                self.local.put(namespace, key, value)
+        return value
+
+    def put(self, namespace: str, key: str, value: Any) -> None:
+        self.shared.put(namespace, key, value)
+        self.local.put(namespace, key, value)
+
+    def clear(self, namespace: str) -> None:
+        self.shared.clear(namespace)
+        self.local.clear(namespace)
+
+    def scan(
+        self, namespace: str, after: str = "", limit: int = 100, prefix: str = ""
+    ) -> List[str]:
+        return self.shared.scan(namespace, after, limit, prefix)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return self.shared.stats()
+
+    def claim_lease(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        return self.shared.claim_lease(name, owner, ttl_seconds)
+
+
+def create_cache_store(limits: Dict[str, Dict[str, Any]]) -> CacheStore:
+    """
+    Create the backend selected by CACHE_BACKEND.
+
+    Args:
+        limits: Per-namespace BoundedCache keyword arguments; ttl_seconds is
+            also applied by the shared backends
+
+    Returns:
+        CacheStore instance
+    """
+    backend = os.environ.get("CACHE_BACKEND", "memory").lower()
+    local = MemoryCacheStore(limits, os.environ.get("LEASE_LOCK_DIR"))
+
+    if backend == "memory":
+        return local
+    if backend == "sqlite":
+        path = os.environ.get("CACHE_SQLITE_PATH", "cache.sqlite3")
+        ttl_seconds = {ns: limits.get(ns, {}).get("ttl_seconds") for ns in NAMESPACES}
+        return TieredCacheStore(local, SQLiteCacheStore(path, ttl_seconds))
+    if backend == "kv":
+        base_url = os.environ.get("CACHE_KV_URL", "http://127.0.0.1:8100")
+        return TieredCacheStore(local, KeyValueCacheStore(base_url))
+    raise ValueError(f"Unknown cache backend '{backend}' (expected memory, sqlite or kv)")
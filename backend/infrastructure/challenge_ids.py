@@ -0,0 +1,181 @@
+"""
+Challenge IDs - Unique, time-ordered challenge identifiers
+
+IDs are 53-bit integers (exact in JavaScript numbers) laid out as
+
+    | seconds since 2025-01-01 UTC (31) | worker (10) | sequence (12) |
+
+so IDs from different workers never collide, each worker can issue 4096
+IDs per second before borrowing from the next second, and the age of a
+challenge can be read from its ID without a cache lookup.
+
+IDs exceed 32 bits: the quiz_attempts.challenge_id column must be BIGINT
+(database_setup.sql; migrations/001_challenge_id_bigint.sql for older
+databases).
+
+Every process leases its worker number from the cache store (see
+claim_worker_id), so numbers are unique among all processes sharing the
+store: across nodes with CACHE_BACKEND=kv or a shared SQLite file, and
+among the processes of one host with the memory backend. A lease lasts
+WORKER_LEASE_SECONDS and is renewed halfway through.
+"""
+
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+ID_EPOCH = 1735689600  # 2025-01-01T00:00:00Z
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+TIMESTAMP_SHIFT = WORKER_BITS + SEQUENCE_BITS
+
+WORKER_LEASE_SECONDS = 60.0
+# Retry delay when the cache store cannot grant a lease
+WORKER_LEASE_RETRY_SECONDS = 5.0
+
+
+class ChallengeIdAllocator:
+    """Thread-safe generator of strictly increasing challenge IDs."""
+
+    def __init__(self, worker_id: int):
+        """
+        Args:
+            worker_id: Number of this worker process (0-1023)
+        """
+        if not 0 <= worker_id <= MAX_WORKER_ID:
+            raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+        self._last_second = 0
+        self._sequence = -1
+
+    def next_id(self) -> int:
+        """
+        Allocate a new ID.
+
+        When a second's sequence numbers run out, the allocator moves on to
+        the next second instead of waiting, so IDs stay unique and ordered.
+        """
+        with self._lock:
+            second = max(int(time.time()) - ID_EPOCH, self._last_second)
+            if second == self._last_second:
+                self._sequence += 1
+                if self._sequence > MAX_SEQUENCE:
+                    second += 1
+                    self._sequence = 0
+            else:
+                self._sequence = 0
+            self._last_second = second
+            return (
+                (second << TIMESTAMP_SHIFT)
+                | (self.worker_id << SEQUENCE_BITS)
+                | self._sequence
+            )
+
+
+def challenge_id_timestamp(challenge_id: int) -> float:
+    """Unix time at which a challenge ID was issued."""
+    return (challenge_id >> TIMESTAMP_SHIFT) + ID_EPOCH
+
+
+def challenge_id_age(challenge_id: int, now: Optional[float] = None) -> float:
+    """Seconds since a challenge ID was issued."""
+    return (time.time() if now is None else now) - challenge_id_timestamp(challenge_id)
+
+
+def claim_worker_id(
+    claim: Callable[[str, str, float], bool],
+    owner: str,
+    preferred: Optional[int] = None,
+) -> int:
+    """
+    Lease a worker number no other process holds.
+
+    Args:
+        claim: Lease function taking (name, owner, ttl_seconds) and
+            returning whether it was granted (see CacheStore.claim_lease)
+        owner: Identifier unique to this process
+        preferred: Number to try first, e.g. the one held (default: random)
+
+    Returns:
+        Leased worker number
+
+    Raises:
+        RuntimeError: If every worker number is leased
+    """
+    start = random.randrange(MAX_WORKER_ID + 1) if preferred is None else preferred
+    for offset in range(MAX_WORKER_ID + 1):
+        worker_id = (start + offset) & MAX_WORKER_ID
+        if claim(f"challenge-id-worker-{worker_id}", owner, WORKER_LEASE_SECONDS):
+            return worker_id
+    raise RuntimeError("Every challenge ID worker number is leased")
+
+
+_allocator: Optional[ChallengeIdAllocator] = None
+_allocator_pid: Optional[int] = None
+_lease_owner = ""
+_lease_renew_at = 0.0
+_allocator_lock = threading.Lock()
+
+
+def _lease_due() -> bool:
+    return (
+        _allocator is None
+        or _allocator_pid != os.getpid()
+        or time.monotonic() >= _lease_renew_at
+    )
+
+
+def _renew_worker_lease() -> None:
+    """Lease or renew this process's worker number; caller holds _allocator_lock."""
+    # pylint: disable=global-statement
+    global _allocator, _allocator_pid, _lease_owner, _lease_renew_at
+    # audio_cache imports this module
+    from infrastructure.audio_cache import (  # pylint: disable=import-outside-toplevel
+        claim_lease,
+    )
+
+    pid = os.getpid()
+    if _allocator is None or _allocator_pid != pid:
+        # New process (or forked child): the parent's lease is not ours
+        _lease_owner = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+        current = None
+    else:
+        current = _allocator.worker_id
+
+    started = time.monotonic()
+    try:
+        worker_id = claim_worker_id(claim_lease, _lease_owner, current)
+        renew_at = started + WORKER_LEASE_SECONDS / 2
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        # Keep issuing IDs, but uniqueness is not guaranteed until a lease
+        # is granted
+        logger.warning("Could not lease a challenge ID worker number: %s", e)
+        if current is None:
+            current = random.randrange(MAX_WORKER_ID + 1)
+        worker_id = current
+        renew_at = started + WORKER_LEASE_RETRY_SECONDS
+
+    if _allocator is None or _allocator_pid != pid or worker_id != current:
+        _allocator = ChallengeIdAllocator(worker_id)
+        logger.info("Issuing challenge IDs as worker %d", worker_id)
+    _allocator_pid = pid
+    _lease_renew_at = renew_at
+
+
+def new_challenge_id() -> int:
+    """Allocate an ID from the process-wide allocator."""
+    if _lease_due():
+        with _allocator_lock:
+            if _lease_due():
+                _renew_worker_lease()
+    return _allocator.next_id()
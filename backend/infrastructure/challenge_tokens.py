@@ -0,0 +1,106 @@
+"""
+Challenge Tokens - HMAC-signed, self-contained challenge answers
+
+When CHALLENGE_TOKEN_SECRET is set, each generated challenge carries a token
+encoding its ID, difficulty, correct answer, word and expiry. Submitting the
+token lets any worker grade the answer without looking the challenge up in
+a cache. All workers and nodes must share the same secret.
+
+Token format: base64url(JSON claims) "." base64url(HMAC-SHA256 signature)
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from typing import Dict, Optional
+
+CHALLENGE_TOKEN_TTL_SECONDS = int(os.environ.get("CHALLENGE_TOKEN_TTL_SECONDS", "3600"))
+
+
+def _secret() -> Optional[bytes]:
+    secret = os.environ.get("CHALLENGE_TOKEN_SECRET")
+    return secret.encode("utf-8") if secret else None
+
+
+def tokens_enabled() -> bool:
+    """Whether signed challenge tokens are issued and accepted."""
+    return _secret() is not None
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(secret: bytes, payload: str) -> str:
+    return _b64encode(hmac.new(secret, payload.encode("ascii"), hashlib.sha256).digest())
+
+
+def issue_challenge_token(
+    challenge_id: int, difficulty: str, correct_answer: str, word: str
+) -> Optional[str]:
+    """
+    Create a signed token for a challenge
+
+    Args:
+        challenge_id: Challenge ID
+        difficulty: Difficulty level
+        correct_answer: Correct option letter
+        word: Correct word
+
+    Returns:
+        Token string, or None if tokens are disabled
+    """
+    secret = _secret()
+    if secret is None:
+        return None
+
+    claims = {
+        "id": challenge_id,
+        "difficulty": difficulty,
+        "correct_answer": correct_answer,
+        "word": word,
+        "exp": int(time.time()) + CHALLENGE_TOKEN_TTL_SECONDS,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode("utf-8"))
+    return f"{payload}.{_sign(secret, payload)}"
+
+
+def verify_challenge_token(token: str) -> Optional[Dict]:
+    """
+    Check a token's signature and expiry
+
+    Args:
+        token: Token from issue_challenge_token
+
+    Returns:
+        Challenge claims (id, difficulty, correct_answer, word, exp), or None
+        if tokens are disabled or the token is malformed, forged or expired
+    """
+    secret = _secret()
+    if secret is None:
+        return None
+
+    # Tokens are pure base64url; anything else would make the ASCII encoding
+    # and constant-time comparison below raise instead of failing cleanly
+    if not token.isascii():
+        return None
+
+    payload, _, signature = token.partition(".")
+    if not payload or not hmac.compare_digest(signature, _sign(secret, payload)):
+        return None
+
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        return None
+
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims
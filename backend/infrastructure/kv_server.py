@@ -0,0 +1,106 @@
+"""
+KV Server - Minimal shared key-value server for CACHE_BACKEND=kv
+
+A local stand-in for a networked cache (Redis, Memcached, ...) implementing
+the protocol spoken by cache_stores.KeyValueCacheStore. Entries are held in
+bounded LRU caches so the server cannot grow without limit.
+
+Run with: python -m infrastructure.kv_server [--host HOST] [--port PORT]
+"""
+
+import argparse
+import os
+import time
+from typing import Dict, Tuple
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+
+from infrastructure.bounded_cache import BoundedCache
+from infrastructure.cache_stores import AUDIO, NAMESPACES
+
+KV_MAX_BYTES = int(os.environ.get("KV_MAX_BYTES", "1073741824"))
+KV_TTL_SECONDS = float(os.environ.get("KV_TTL_SECONDS", "86400"))
+
+app = FastAPI(title="Pronunciation Coach KV")
+
+_namespaces: Dict[str, BoundedCache] = {
+    namespace: BoundedCache(max_bytes=KV_MAX_BYTES, ttl_seconds=KV_TTL_SECONDS, size_of=len)
+    for namespace in NAMESPACES
+}
+# Lease name -> (owner, expiry on this server's monotonic clock)
+_leases: Dict[str, Tuple[str, float]] = {}
+
+
+class LeaseRequest(BaseModel):
+    """Body of a lease claim."""
+
+    owner: str
+    ttl_seconds: float = Field(gt=0, le=3600)
+
+
+def _namespace(namespace: str) -> BoundedCache:
+    cache = _namespaces.get(namespace)
+    if cache is None:
+        raise HTTPException(status_code=404, detail=f"Unknown namespace '{namespace}'")
+    return cache
+
+
+@app.get("/kv/{namespace}/{key}")
+async def get_value(namespace: str, key: str):
+    value = _namespace(namespace).get(key)
+    if value is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    return Response(content=value, media_type="application/octet-stream")
+
+
+@app.put("/kv/{namespace}/{key}", status_code=204)
+async def put_value(namespace: str, key: str, request: Request):
+    _namespace(namespace).put(key, await request.body())
+    return Response(status_code=204)
+
+
+@app.delete("/kv/{namespace}", status_code=204)
+async def clear_namespace(namespace: str):
+    _namespace(namespace).clear()
+    return Response(status_code=204)
+
+
+@app.get("/kv/{namespace}")
+async def list_keys(namespace: str, after: str = "", limit: int = 100, prefix: str = ""):
+    return _namespace(namespace).scan(after, min(limit, 1000), prefix)
+
+
+@app.post("/leases/{name}")
+async def claim_lease(name: str, lease: LeaseRequest):
+    # Handlers run on one event loop, so this check-and-set is atomic
+    now = time.monotonic()
+    held = _leases.get(name)
+    if held is not None and held[0] != lease.owner and held[1] > now:
+        raise HTTPException(status_code=409, detail="Lease held by another owner")
+    _leases[name] = (lease.owner, now + lease.ttl_seconds)
+    return {"name": name, "owner": lease.owner}
+
+
+@app.get("/stats")
+async def stats():
+    result = {namespace: cache.stats() for namespace, cache in _namespaces.items()}
+    # Only audio sizes are meaningful to clients; the rest is serialized metadata
+    for namespace, counters in result.items():
+        if namespace != AUDIO:
+            counters["bytes"] = 0
+    return result
+
+
+def main() -> None:
+    import uvicorn  # pylint: disable=import-outside-toplevel
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Logging Config - Leveled, structured logging through a background queue
+
+Request handlers only enqueue log records; a single listener thread formats
+and writes them, so logging never blocks a request on stdout/stderr.
+
+Settings:
+    LOG_LEVEL   Root level (default INFO)
+    LOG_LEVELS  Per-module overrides, e.g.
+                "infrastructure.audio_cache=DEBUG,api=WARNING"
+    LOG_FORMAT  "text" (default) or "json" (one object per line)
+
+Hot-path messages (cache hits and misses, per-request steps) are logged at
+DEBUG, so they are dropped before formatting unless explicitly enabled.
+Third-party loggers that log every request at INFO (httpx, used by the kv
+cache backend) default to WARNING; LOG_LEVELS can lower them again.
+Fields passed with extra={...} are included in both formats.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from typing import Dict, Optional
+
+# Attributes every LogRecord has; anything else came from extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# Default levels of chatty third-party loggers; LOG_LEVELS overrides them
+DEFAULT_LOGGER_LEVELS: Dict[str, str] = {"httpx": "WARNING", "httpcore": "WARNING"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _extra_fields(record: logging.LogRecord) -> Dict:
+    return {k: v for k, v in vars(record).items() if k not in _RECORD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with extra fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record for log shippers."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def parse_levels(spec: str) -> Dict[str, str]:
+    """
+    Parse a LOG_LEVELS value
+
+    Args:
+        spec: Comma-separated "logger=LEVEL" pairs
+
+    Returns:
+        Dict mapping logger name to level name
+    """
+    levels = {}
+    for item in spec.split(","):
+        name, sep, level = item.partition("=")
+        if sep and name.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """Install the queue handler on the root logger and start the listener."""
+    global _listener  # pylint: disable=global-statement
+
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    if os.environ.get("LOG_FORMAT", "text").lower() == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(TextFormatter())
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+    levels = {**DEFAULT_LOGGER_LEVELS, **parse_levels(os.environ.get("LOG_LEVELS", ""))}
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener  # pylint: disable=global-statement
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
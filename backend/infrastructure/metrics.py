@@ -0,0 +1,275 @@
+"""
+Metrics - Process-wide counters, gauges and histograms in Prometheus text format
+
+A dependency-free subset of the Prometheus client: labelled counters,
+gauges and fixed-bucket histograms, plus callback metrics sampled at scrape
+time. render_metrics() produces the text exposition format (0.0.4) served
+by GET /metrics.
+
+With several uvicorn workers each process reports its own values; scrape
+every worker or aggregate at the collector.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; covers cache hits (sub-millisecond) up to slow network TTS calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric:
+    """Common bookkeeping for a named metric with optional labels."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """(suffix, formatted labels, value) for every series."""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabelled series are exported as 0 before the first update
+        self._values: Dict[LabelValues, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, k), v) for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        # Unlabelled series are exported as 0 before the first update
+        self._values: Dict[LabelValues, float] = {} if labelnames else {(): 0.0}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track_in_progress(self, **labels: str) -> Iterator[None]:
+        """Increment while the block runs."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = list(self._values.items())
+        return [("", _format_labels(self.labelnames, k), v) for k, v in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed cumulative buckets."""
+
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts (last is +Inf), sum]
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of the block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            items = [(k, list(counts), total) for k, (counts, total) in self._series.items()]
+
+        samples = []
+        names = self.labelnames + ("le",)
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _format_labels(names, key + (_format_value(bound),))
+                samples.append(("_bucket", labels, cumulative))
+            labels = _format_labels(self.labelnames, key)
+            samples.append(("_count", labels, cumulative))
+            samples.append(("_sum", labels, total))
+        return samples
+
+
+class CallbackMetric(_Metric):
+    """Metric whose values are read from a function at scrape time."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        type_name: str,
+        callback: Callable[[], Dict[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.type_name = type_name
+        self._callback = callback
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        return [
+            ("", _format_labels(self.labelnames, k), v)
+            for k, v in self._callback().items()
+        ]
+
+
+_registry: List[_Metric] = []
+_registry_lock = threading.Lock()
+
+
+def register(metric: _Metric) -> _Metric:
+    """Add a metric to the process-wide registry."""
+    with _registry_lock:
+        _registry.append(metric)
+    return metric
+
+
+def render_metrics() -> str:
+    """All registered metrics in Prometheus text format."""
+    with _registry_lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        try:
+            lines.extend(metric.render())
+        except Exception:  # pylint: disable=broad-exception-caught
+            # A failing callback must not take the whole scrape down
+            continue
+    return "\n".join(lines) + "\n"
+
+
+# Metrics shared across modules
+
+STAGE_SECONDS = register(
+    Histogram(
+        "challenge_stage_duration_seconds",
+        "Time spent in each challenge generation stage",
+        ["stage"],
+    )
+)
+HTTP_REQUEST_SECONDS = register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency by route",
+        ["method", "route", "status"],
+    )
+)
+HTTP_REQUESTS_IN_FLIGHT = register(
+    Gauge("http_requests_in_flight", "HTTP requests currently being handled")
+)
+TTS_REQUESTS = register(
+    Counter("tts_requests_total", "Calls to the TTS backend", ["backend"])
+)
+TTS_ERRORS = register(
+    Counter("tts_errors_total", "Failed calls to the TTS backend", ["backend"])
+)
+TTS_IN_FLIGHT = register(
+    Gauge("tts_requests_in_flight", "TTS backend calls currently running")
+)
+CACHE_LOOKUPS = register(
+    Counter(
+        "cache_lookups_total",
+        "Cache lookups by cache and result (hit or miss)",
+        ["cache", "result"],
+    )
+)
+
+
+def time_stage(stage: str):
+    """Context manager recording the duration of a generation stage."""
+    return STAGE_SECONDS.time(stage=stage)
@@ -0,0 +1,273 @@
+"""
+TTS Backends - Pluggable speech synthesis engines for audio challenges
+
+Engines:
+    gtts     Google Translate TTS (network, MP3)
+    offline  Local pyttsx3 engine from domain.utils.tts_engine (no network)
+    stub     Deterministic fake audio with configurable latency (benchmarks)
+
+The active engine is chosen with environment variables:
+    TTS_BACKEND             gtts | offline | stub (default: gtts)
+    TTS_FALLBACK_BACKEND    Engine to use when the primary one fails
+    TTS_TIMEOUT_SECONDS     Network timeout for gTTS (default: 5)
+    TTS_STUB_LATENCY_MS     Simulated synthesis time for the stub (default: 0)
+"""
+
+import hashlib
+import io
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class TTSBackend:
+    """Base class for speech synthesis engines."""
+
+    name = "base"
+
+    def synthesize(self, text: str, lang: str = "en", slow: bool = False) -> bytes:
+        """
+        Synthesize speech for text.
+
+        Args:
+            text: Text to speak
+            lang: Language code
+            slow: Whether to speak slowly
+
+        Returns:
+            Encoded audio bytes
+
+        Raises:
+            RuntimeError: If synthesis fails
+        """
+        raise NotImplementedError
+
+    def synthesize_with_engine(
+        self, text: str, lang: str = "en", slow: bool = False
+    ) -> Tuple[bytes, str]:
+        """
+        Synthesize speech and report which engine produced it.
+
+        Returns:
+            (encoded audio bytes, name of the engine that synthesized them)
+
+        Raises:
+            RuntimeError: If synthesis fails
+        """
+        return self.synthesize(text, lang=lang, slow=slow), self.name
+
+    @property
+    def preferred_engine(self) -> str:
+        """Name of the engine that synthesizes clips while everything is healthy."""
+        return self.name
+
+    def warm_up(self) -> bool:
+        """Load whatever the engine needs before the first request."""
+        return True
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS; one HTTP round trip per call."""
+
+    name = "gtts"
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.timeout = timeout
+
+    def synthesize(self, text: str, lang: str = "en", slow: bool = False) -> bytes:
+        from gtts import gTTS  # pylint: disable=import-outside-toplevel
+
+        tts = gTTS(
+            text=text, lang=lang, slow=slow, lang_check=False, timeout=self.timeout
+        )
+
+        audio_fp = io.BytesIO()
+        tts.write_to_fp(audio_fp)
+        return audio_fp.getvalue()
+
+    def warm_up(self) -> bool:
+        try:
+            import gtts  # noqa: F401  # pylint: disable=import-outside-toplevel,unused-import
+
+            return True
+        except ImportError:
+            return False
+
+
+class OfflineTTSBackend(TTSBackend):
+    """Local pyttsx3 engine (SAPI5 / NSSpeechSynthesizer / eSpeak)."""
+
+    name = "offline"
+
+    def __init__(self, rate: int = 160, slow_rate: int = 100):
+        self.rate = rate
+        self.slow_rate = slow_rate
+        # pyttsx3 engines are not thread-safe
+        self._lock = threading.Lock()
+        self._engine = None
+        # Set when initialization failed, so calls fail fast until warm_up
+        self._init_failed = False
+
+    def _get_engine(self):
+        if self._engine is None and not self._init_failed:
+            from domain.utils.tts_engine import get_tts_engine  # pylint: disable=import-outside-toplevel
+
+            # Never pip-install from the request path
+            self._engine = get_tts_engine(rate=self.rate, auto_install=False)
+            self._init_failed = self._engine is None
+        return self._engine
+
+    def synthesize(self, text: str, lang: str = "en", slow: bool = False) -> bytes:
+        from domain.utils.tts_engine import synthesize_to_bytes  # pylint: disable=import-outside-toplevel
+
+        with self._lock:
+            engine = self._get_engine()
+            if engine is None:
+                raise RuntimeError("pyttsx3 engine unavailable")
+            audio = synthesize_to_bytes(
+                text, engine=engine, rate=self.slow_rate if slow else self.rate
+            )
+        if not audio:
+            raise RuntimeError(f"Offline synthesis failed for {text!r}")
+        return audio
+
+    def warm_up(self) -> bool:
+        with self._lock:
+            # Warm-up (and its retries) get a fresh attempt at initialization
+            self._init_failed = False
+            return self._get_engine() is not None
+
+
+class StubTTSBackend(TTSBackend):
+    """
+    Deterministic fake audio for benchmarks and offline development.
+
+    The same (text, lang, slow) always yields the same bytes, sized roughly
+    like a real clip, after sleeping latency_ms to mimic a remote engine.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+
+    def synthesize(self, text: str, lang: str = "en", slow: bool = False) -> bytes:
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms / 1000.0)
+
+        seed = hashlib.sha256(f"{lang}|{int(slow)}|{text}".encode("utf-8")).digest()
+        size = 2048 + 512 * len(text) * (2 if slow else 1)
+        # ID3v2 header so the payload sniffs as MP3
+        return b"ID3\x04\x00\x00\x00\x00\x00\x00" + random.Random(seed).randbytes(size)
+
+
+class FailoverTTSBackend(TTSBackend):
+    """Try the primary engine and fall back to a secondary one on any error."""
+
+    def __init__(self, primary: TTSBackend, fallback: TTSBackend):
+        self.primary = primary
+        self.fallback = fallback
+        self.name = f"{primary.name}+{fallback.name}"
+
+    def synthesize(self, text: str, lang: str = "en", slow: bool = False) -> bytes:
+        return self.synthesize_with_engine(text, lang=lang, slow=slow)[0]
+
+    def synthesize_with_engine(
+        self, text: str, lang: str = "en", slow: bool = False
+    ) -> Tuple[bytes, str]:
+        try:
+            return self.primary.synthesize_with_engine(text, lang=lang, slow=slow)
+        except Exception:  # pylint: disable=broad-exception-caught
+            return self.fallback.synthesize_with_engine(text, lang=lang, slow=slow)
+
+    @property
+    def preferred_engine(self) -> str:
+        return self.primary.preferred_engine
+
+    def warm_up(self) -> bool:
+        primary_ready = self.primary.warm_up()
+        fallback_ready = self.fallback.warm_up()
+        return primary_ready or fallback_ready
+
+
+def _create_backend(name: str) -> TTSBackend:
+    """Instantiate an engine by name using its environment settings."""
+    if name == "gtts":
+        return GTTSBackend(timeout=float(os.environ.get("TTS_TIMEOUT_SECONDS", "5")))
+    if name == "offline":
+        return OfflineTTSBackend()
+    if name == "stub":
+        latency_ms = float(os.environ.get("TTS_STUB_LATENCY_MS", "0"))
+        return StubTTSBackend(latency_ms=latency_ms)
+    raise ValueError(f"Unknown TTS backend '{name}' (expected gtts, offline or stub)")
+
+
+_backend: Optional[TTSBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_tts_backend() -> TTSBackend:
+    """
+    Return the process-wide TTS engine configured by the environment.
+
+    Returns:
+        TTSBackend instance (wrapped in a failover if TTS_FALLBACK_BACKEND is set)
+    """
+    global _backend  # pylint: disable=global-statement
+
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = os.environ.get("TTS_BACKEND", "gtts").lower()
+                fallback_name = os.environ.get("TTS_FALLBACK_BACKEND", "").lower()
+                backend = _create_backend(name)
+                if fallback_name:
+                    fallback = _create_backend(fallback_name)
+                    backend = FailoverTTSBackend(backend, fallback)
+                _backend = backend
+
+    return _backend
+
+
+def set_tts_backend(backend: Optional[TTSBackend]) -> None:
+    """
+    Override the process-wide TTS engine.
+
+    Args:
+        backend: Engine to use, or None to re-read the environment on next use
+    """
+    global _backend  # pylint: disable=global-statement
+    _backend = backend
+
+
+_MEDIA_TYPE_SIGNATURES: Dict[bytes, str] = {
+    b"ID3": "audio/mpeg",
+    b"\xff\xfb": "audio/mpeg",
+    b"\xff\xf3": "audio/mpeg",
+    b"\xff\xf2": "audio/mpeg",
+    b"RIFF": "audio/wav",
+    b"FORM": "audio/aiff",
+    b"OggS": "audio/ogg",
+}
+
+MEDIA_TYPE_EXTENSIONS: Dict[str, str] = {
+    "audio/mpeg": "mp3",
+    "audio/wav": "wav",
+    "audio/aiff": "aiff",
+    "audio/ogg": "ogg",
+}
+
+
+def sniff_media_type(audio: bytes) -> str:
+    """
+    Guess the media type of synthesized audio from its leading bytes.
+
+    Engines differ in output format (gTTS produces MP3, pyttsx3 WAV or AIFF),
+    so the type is taken from the clip itself.
+    """
+    for signature, media_type in _MEDIA_TYPE_SIGNATURES.items():
+        if audio.startswith(signature):
+            return media_type
+    return "audio/mpeg"
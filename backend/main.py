@@ -5,30 +5,100 @@ FastAPI application serving audio challenges and progress tracking
 for the Pronunciation Coach mobile app.
 """
 
+import asyncio
+import logging
 import sys
+import time
+from contextlib import asynccontextmanager
+from functools import partial
 from pathlib import Path
 
+# Add project root to path (before any first-party import)
+sys.path.insert(0, str(Path(__file__).parent))
+
 # Third-party imports
-from fastapi import FastAPI
+from fastapi import FastAPI, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 
 # First-party imports
 from api.audio_challenge_service import router as audio_router
+from domain.audio_challenge_logic import (
+    generate_audio_challenges,
+    warm_up,
+)
+from domain.challenge_pool import (
+    get_pool_sizes,
+    start_challenge_pool,
+    stop_challenge_pool,
+)
 from infrastructure.audio_cache import (
-    _audio_cache,
-    _challenge_cache,
     get_cache_stats,
+    scan_cache_keys,
+)
+from infrastructure.logging_config import configure_logging
+from infrastructure.metrics import (
+    CONTENT_TYPE,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_FLIGHT,
+    CallbackMetric,
+    register,
+    render_metrics,
 )
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent))
+configure_logging()
+logger = logging.getLogger(__name__)
 
 # Note: Supabase client removed - all data operations now handled by frontend
 
+
+# Delay before retrying a failed warm-up, doubled up to the maximum
+WARM_UP_RETRY_SECONDS = 1.0
+WARM_UP_MAX_RETRY_SECONDS = 60.0
+
+
+async def _warm_up(application: FastAPI) -> None:
+    """
+    Load the word index and TTS backend off the event loop.
+
+    Retries with exponential backoff until every resource is ready, so a
+    transient failure (corpus download, TTS engine) does not leave the
+    worker unready for its whole life.
+    """
+    delay = WARM_UP_RETRY_SECONDS
+    while True:
+        status = await asyncio.to_thread(warm_up)
+        application.state.warm_up_status = status
+        application.state.ready = all(status.values())
+        if application.state.ready:
+            break
+        logger.warning("Warm-up incomplete, retrying in %.0fs: %s", delay, status)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, WARM_UP_MAX_RETRY_SECONDS)
+
+    logger.info("Warm-up finished: %s", status)
+
+    # Pre-generate challenges once resources are warm (no-op if disabled);
+    # only challenges with audio for every option are pooled
+    start_challenge_pool(partial(generate_audio_challenges, require_audio=True))
+
+
+@asynccontextmanager
+async def lifespan(application: FastAPI):
+    """Start serving immediately and warm heavy resources in the background."""
+    application.state.ready = False
+    application.state.warm_up_status = {}
+    warm_up_task = asyncio.create_task(_warm_up(application))
+    yield
+    warm_up_task.cancel()
+    stop_challenge_pool()
+
+
 app = FastAPI(
     title="Pronunciation Coach API",
     description="Backend for pronunciation coach app - Audio Challenges & Quizzes",
     version="0.2.0",
+    lifespan=lifespan,
 )
 
 # Enable CORS for Flutter
@@ -44,6 +114,37 @@ app.add_middleware(
 # Removed the inclusion of challenge_router.
 app.include_router(audio_router, prefix="/api", tags=["audio"])
 
+register(
+    CallbackMetric(
+        "challenge_pool_size",
+        "Pre-generated challenges ready per difficulty",
+        "gauge",
+        lambda: {(d,): n for d, n in get_pool_sizes().items()},
+        ["difficulty"],
+    )
+)
+
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request, labelled by route template to bound cardinality."""
+    start = time.perf_counter()
+    status = 500
+    HTTP_REQUESTS_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status),
+        )
+
 
 @app.get("/")
 async def root():
@@ -65,24 +166,60 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "healthy", "cache_stats": get_cache_stats()}
+    # Shared cache backends do blocking I/O; keep it off the event loop
+    return {
+        "status": "healthy",
+        "cache_stats": await asyncio.to_thread(get_cache_stats),
+        "challenge_pool": get_pool_sizes(),
+    }
 
 
-@app.get("/debug/cache")
-async def debug_cache():
-    """Debug endpoint to check cache contents."""
-    stats = get_cache_stats()
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage and route latencies, cache and TTS counters."""
+    # Callback metrics read cache store counters, which may block
+    content = await asyncio.to_thread(render_metrics)
+    return Response(content=content, media_type=CONTENT_TYPE)
+
 
-    # Get all cached challenge IDs and audio keys
-    challenge_ids = list(_challenge_cache.keys())
-    audio_keys = list(_audio_cache.keys())
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until the word index and TTS backend are warm."""
+    ready = getattr(app.state, "ready", False)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "warming_up",
+            "checks": getattr(app.state, "warm_up_status", {}),
+        },
+    )
+
+
+@app.get("/debug/cache")
+async def debug_cache(
+    namespace: str = Query("challenges", pattern="^(audio|links|challenges)$"),
+    cursor: str = "",
+    limit: int = Query(100, ge=1, le=1000),
+    prefix: str = "",
+):
+    """
+    Debug endpoint to check cache contents.
+
+    Lists one page of a namespace's keys in sorted order; pass next_cursor
+    back as cursor for the following page. Challenge IDs are time-ordered,
+    so challenges are listed oldest first.
+    """
+    stats = await asyncio.to_thread(get_cache_stats)
+    keys, next_cursor = await asyncio.to_thread(
+        scan_cache_keys, namespace, cursor, limit, prefix
+    )
 
     return {
         "status": "ok",
         "stats": stats,
-        "cached_challenges": challenge_ids,
-        "cached_audio_keys": audio_keys,
-        "sample_audio_keys": audio_keys[:10] if audio_keys else [],
+        "namespace": namespace,
+        "keys": keys,
+        "next_cursor": next_cursor,
     }
 
 
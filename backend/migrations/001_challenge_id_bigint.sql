@@ -0,0 +1,10 @@
+-- Migration: widen quiz_attempts.challenge_id to BIGINT
+-- Run in your Supabase SQL Editor on databases created with an older
+-- database_setup.sql (new setups already create the column as BIGINT).
+--
+-- Challenge IDs are 53-bit, time-ordered integers (see
+-- backend/infrastructure/challenge_ids.py) and no longer fit in INTEGER;
+-- inserting a quiz attempt fails with "integer out of range" until the
+-- column is widened. Existing values are kept unchanged.
+
+ALTER TABLE quiz_attempts ALTER COLUMN challenge_id TYPE BIGINT;
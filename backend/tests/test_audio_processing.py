@@ -0,0 +1,47 @@
+"""Tests for audio post-processing and encoding selection."""
+
+import os
+
+from infrastructure import audio_processing
+from infrastructure.audio_processing import process_audio, select_encodings
+
+
+def _fake_ffmpeg(sizes):
+    """subprocess.run stand-in writing outputs of the given sizes, in order."""
+
+    def run(command, **kwargs):
+        outputs = [arg for arg in command if os.path.basename(arg).startswith("out")]
+        for path, size in zip(outputs, sizes):
+            with open(path, "wb") as f:
+                f.write(b"x" * size)
+
+    return run
+
+
+def test_keeps_only_smaller_encodings(monkeypatch):
+    monkeypatch.setattr(
+        audio_processing, "available_encodings", lambda: ("standard", "compact")
+    )
+    monkeypatch.setattr(audio_processing.subprocess, "run", _fake_ffmpeg([120, 40]))
+
+    encoded = process_audio(b"a" * 100)
+    assert encoded == {"compact": b"x" * 40}
+
+
+def test_processing_unavailable(monkeypatch):
+    monkeypatch.setattr(audio_processing, "available_encodings", lambda: ())
+    assert process_audio(b"a" * 100) == {}
+
+
+def test_select_encodings():
+    assert select_encodings() == ("standard",)
+    assert select_encodings(save_data="on") == ("compact",)
+    assert select_encodings("original") == ()
+    assert select_encodings("compact", accept="audio/ogg, audio/mpeg") == (
+        "compact-opus",
+        "compact",
+    )
+    assert select_encodings("compact", accept="*/*") == ("compact",)
+    assert select_encodings("compact", accept="audio/ogg;q=0.5, audio/mpeg") == (
+        "compact",
+    )
@@ -0,0 +1,113 @@
+"""Tests for byte-range parsing and ETag revalidation of audio clips."""
+
+import pytest
+from fastapi import Request
+
+from api.audio_responses import (
+    RangeNotSatisfiable,
+    audio_etag,
+    audio_response,
+    etag_matches,
+    parse_range,
+)
+
+AUDIO = bytes(range(100))
+
+
+def _request(**headers: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "headers": [
+                (name.replace("_", "-").encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers.items()
+            ],
+        }
+    )
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-9", (0, 9)),
+        ("bytes=90-", (90, 99)),
+        ("bytes=50-500", (50, 99)),
+        ("bytes=-10", (90, 99)),
+        ("bytes=-500", (0, 99)),
+        ("BYTES = 5-5", (5, 5)),
+    ],
+)
+def test_parse_range(header, expected):
+    assert parse_range(header, len(AUDIO)) == expected
+
+
+@pytest.mark.parametrize(
+    "header",
+    [None, "", "items=0-9", "bytes=0-9,20-29", "bytes=abc", "bytes=5", "bytes=9-1"],
+)
+def test_parse_range_whole_clip(header):
+    assert parse_range(header, len(AUDIO)) is None
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=200-300", "bytes=-0"])
+def test_parse_range_not_satisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, len(AUDIO))
+
+
+def test_etag_matches():
+    etag = audio_etag(AUDIO)
+    assert etag_matches(etag, etag)
+    assert etag_matches(f"W/{etag}", etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches("", etag)
+
+
+def test_audio_response_full_clip():
+    response = audio_response(_request(), AUDIO, "audio/mpeg", "a.mp3")
+    assert response.status_code == 200
+    assert response.body == AUDIO
+    assert response.headers["etag"] == audio_etag(AUDIO)
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_audio_response_not_modified():
+    request = _request(if_none_match=audio_etag(AUDIO))
+    response = audio_response(request, AUDIO, "audio/mpeg", "a.mp3")
+    assert response.status_code == 304
+    assert response.body == b""
+
+
+def test_audio_response_partial():
+    response = audio_response(_request(range="bytes=-10"), AUDIO, "audio/mpeg", "a.mp3")
+    assert response.status_code == 206
+    assert response.body == AUDIO[90:]
+    assert response.headers["content-range"] == "bytes 90-99/100"
+
+
+def test_audio_response_range_not_satisfiable():
+    response = audio_response(
+        _request(range="bytes=100-"), AUDIO, "audio/mpeg", "a.mp3"
+    )
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */100"
+
+
+def test_audio_response_if_range_current():
+    request = _request(range="bytes=0-9", if_range=audio_etag(AUDIO))
+    response = audio_response(request, AUDIO, "audio/mpeg", "a.mp3")
+    assert response.status_code == 206
+    assert response.body == AUDIO[:10]
+
+
+def test_audio_response_if_range_stale():
+    # The client's partial copy is of another clip: it must get the whole one
+    request = _request(range="bytes=0-9", if_range='"stale"')
+    response = audio_response(request, AUDIO, "audio/mpeg", "a.mp3")
+    assert response.status_code == 200
+    assert response.body == AUDIO
+    assert "content-range" not in response.headers
@@ -0,0 +1,77 @@
+"""Tests for the bounded LRU cache and its sorted key scan."""
+
+import random
+
+from infrastructure import bounded_cache
+from infrastructure.bounded_cache import BoundedCache
+
+
+def _all_pages(cache: BoundedCache, limit: int, prefix: str = ""):
+    keys, after = [], ""
+    while True:
+        page = cache.scan(after, limit, prefix)
+        keys += page
+        if len(page) < limit:
+            return keys
+        after = page[-1]
+
+
+def test_scan_pages_in_sorted_order():
+    cache = BoundedCache()
+    keys = [f"{random.Random(i).getrandbits(32):08x}" for i in range(500)]
+    for key in keys:
+        cache.put(key, 1)
+
+    assert cache.scan(limit=3) == sorted(keys)[:3]
+    assert _all_pages(cache, 7) == sorted(set(keys))
+
+
+def test_scan_prefix():
+    cache = BoundedCache()
+    for key in ("a1", "b1", "b2", "b3", "c1"):
+        cache.put(key, 1)
+
+    assert cache.scan(prefix="b") == ["b1", "b2", "b3"]
+    assert cache.scan(after="b1", prefix="b") == ["b2", "b3"]
+    assert cache.scan(after="a", prefix="b", limit=1) == ["b1"]
+    assert cache.scan(after="b3", prefix="b") == []
+    assert cache.scan(after="c", prefix="b") == []
+    assert _all_pages(cache, 2, prefix="b") == ["b1", "b2", "b3"]
+
+
+def test_scan_follows_removals():
+    cache = BoundedCache(max_entries=3)
+    for key in ("a", "b", "c", "d"):
+        cache.put(key, 1)
+    assert cache.scan() == ["b", "c", "d"]
+
+    cache.put("c", 2)
+    cache.pop("b")
+    assert cache.scan() == ["c", "d"]
+
+    cache.clear()
+    assert cache.scan() == []
+
+
+def test_scan_follows_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(bounded_cache.time, "monotonic", lambda: now[0])
+    cache = BoundedCache(ttl_seconds=10)
+    cache.put("old", 1)
+    now[0] += 11
+    cache.put("new", 1)
+
+    assert cache.scan() == ["new"]
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = BoundedCache(max_bytes=10, size_of=len)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    cache.get("a")
+    cache.put("c", b"1234")
+
+    assert "b" not in cache
+    assert cache.total_bytes == 8
+    assert cache.scan() == ["a", "c"]
+    assert cache.stats()["evictions"] == 1
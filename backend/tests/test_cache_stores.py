@@ -0,0 +1,104 @@
+"""Tests for the cache store backends."""
+
+import pytest
+
+from infrastructure import cache_stores
+from infrastructure.cache_stores import (
+    AUDIO,
+    CHALLENGES,
+    LINKS,
+    MemoryCacheStore,
+    SQLiteCacheStore,
+    TieredCacheStore,
+)
+
+
+@pytest.fixture
+def sqlite_path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_sqlite_shared_between_stores(sqlite_path):
+    # Two stores on one file stand in for two worker processes
+    first = SQLiteCacheStore(sqlite_path, {})
+    second = SQLiteCacheStore(sqlite_path, {})
+
+    first.put(AUDIO, "clip", b"\x00\xff")
+    first.put(LINKS, "link", "clip")
+    first.put(CHALLENGES, "1", {"id": 1, "word": "cat"})
+
+    assert second.get(AUDIO, "clip") == b"\x00\xff"
+    assert second.get(LINKS, "link") == "clip"
+    assert second.get(CHALLENGES, "1") == {"id": 1, "word": "cat"}
+    assert second.get(CHALLENGES, "2") is None
+
+
+def test_sqlite_counters(sqlite_path):
+    store = SQLiteCacheStore(sqlite_path, {})
+    store.put(AUDIO, "a", b"12345")
+    store.put(AUDIO, "b", b"123")
+    store.put(AUDIO, "a", b"1")
+
+    assert store.stats()[AUDIO]["entries"] == 2
+    assert store.stats()[AUDIO]["bytes"] == 4
+
+    store.clear(AUDIO)
+    assert store.stats()[AUDIO]["entries"] == 0
+    assert store.stats()[AUDIO]["bytes"] == 0
+
+
+def test_sqlite_expiry(sqlite_path, monkeypatch):
+    store = SQLiteCacheStore(sqlite_path, {CHALLENGES: 60})
+    store.put(CHALLENGES, "1", {"id": 1})
+    assert store.get(CHALLENGES, "1") == {"id": 1}
+
+    now = cache_stores.time.time()
+    monkeypatch.setattr(cache_stores.time, "time", lambda: now + 61)
+    assert store.get(CHALLENGES, "1") is None
+
+
+def test_sqlite_scan(sqlite_path):
+    store = SQLiteCacheStore(sqlite_path, {})
+    for key in ("b1", "a2", "a1", "a3"):
+        store.put(LINKS, key, "x")
+
+    assert store.scan(LINKS, limit=2) == ["a1", "a2"]
+    assert store.scan(LINKS, after="a2") == ["a3", "b1"]
+    assert store.scan(LINKS, prefix="b") == ["b1"]
+
+
+def test_tiered_reads_through(sqlite_path):
+    shared = SQLiteCacheStore(sqlite_path, {})
+    writer = TieredCacheStore(MemoryCacheStore({}), shared)
+    reader = TieredCacheStore(MemoryCacheStore({}), SQLiteCacheStore(sqlite_path, {}))
+
+    writer.put(LINKS, "link", "clip")
+    assert reader.local.get(LINKS, "link") is None
+    assert reader.get(LINKS, "link") == "clip"
+    assert reader.local.get(LINKS, "link") == "clip"
+
+
+def test_memory_lease_exclusive_per_host(tmp_path):
+    # Two stores stand in for two processes: each holds its own lock file handle
+    first = MemoryCacheStore({}, lock_dir=str(tmp_path))
+    second = MemoryCacheStore({}, lock_dir=str(tmp_path))
+
+    assert first.claim_lease("worker-1", "a", 60)
+    assert first.claim_lease("worker-1", "a", 60)
+    assert not second.claim_lease("worker-1", "b", 60)
+    assert second.claim_lease("worker-2", "b", 60)
+
+
+def test_sqlite_lease(sqlite_path, monkeypatch):
+    first = SQLiteCacheStore(sqlite_path, {})
+    second = SQLiteCacheStore(sqlite_path, {})
+
+    assert first.claim_lease("worker-1", "a", 60)
+    assert first.claim_lease("worker-1", "a", 60)
+    assert not second.claim_lease("worker-1", "b", 60)
+
+    # Once expired, the lease goes to the next claimant
+    now = cache_stores.time.time()
+    monkeypatch.setattr(cache_stores.time, "time", lambda: now + 61)
+    assert second.claim_lease("worker-1", "b", 60)
+    assert not first.claim_lease("worker-1", "a", 60)
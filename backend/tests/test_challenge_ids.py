@@ -0,0 +1,102 @@
+"""Tests for challenge ID allocation and worker number leases."""
+
+import pytest
+
+from infrastructure import challenge_ids
+from infrastructure.challenge_ids import (
+    ID_EPOCH,
+    MAX_SEQUENCE,
+    MAX_WORKER_ID,
+    SEQUENCE_BITS,
+    ChallengeIdAllocator,
+    challenge_id_age,
+    challenge_id_timestamp,
+    claim_worker_id,
+)
+
+NOW = ID_EPOCH + 1_000_000.5
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    monkeypatch.setattr(challenge_ids.time, "time", lambda: NOW)
+
+
+def _worker(challenge_id: int) -> int:
+    return (challenge_id >> SEQUENCE_BITS) & MAX_WORKER_ID
+
+
+def _sequence(challenge_id: int) -> int:
+    return challenge_id & MAX_SEQUENCE
+
+
+def test_layout(frozen_time):
+    challenge_id = ChallengeIdAllocator(7).next_id()
+    assert challenge_id < 2**53
+    assert _worker(challenge_id) == 7
+    assert _sequence(challenge_id) == 0
+    assert challenge_id_timestamp(challenge_id) == int(NOW)
+    assert challenge_id_age(challenge_id, now=NOW + 10) == pytest.approx(10.5)
+
+
+def test_sequence_overflow_borrows_next_second(frozen_time):
+    allocator = ChallengeIdAllocator(3)
+    ids = [allocator.next_id() for _ in range(MAX_SEQUENCE + 3)]
+
+    assert ids == sorted(ids)
+    assert len(set(ids)) == len(ids)
+    assert challenge_id_timestamp(ids[MAX_SEQUENCE]) == int(NOW)
+    overflow = ids[MAX_SEQUENCE + 1]
+    assert challenge_id_timestamp(overflow) == int(NOW) + 1
+    assert _sequence(overflow) == 0
+    assert _worker(overflow) == 3
+
+
+def test_clock_going_back_keeps_order(monkeypatch):
+    allocator = ChallengeIdAllocator(0)
+    monkeypatch.setattr(challenge_ids.time, "time", lambda: NOW)
+    first = allocator.next_id()
+    monkeypatch.setattr(challenge_ids.time, "time", lambda: NOW - 5)
+    assert allocator.next_id() > first
+
+
+def test_workers_do_not_collide(frozen_time):
+    ids = {ChallengeIdAllocator(worker).next_id() for worker in (0, 1, MAX_WORKER_ID)}
+    assert len(ids) == 3
+
+
+@pytest.mark.parametrize("worker_id", [-1, MAX_WORKER_ID + 1])
+def test_invalid_worker_id(worker_id):
+    with pytest.raises(ValueError):
+        ChallengeIdAllocator(worker_id)
+
+
+class FakeLeases:
+    """In-memory claim function: leases never expire."""
+
+    def __init__(self):
+        self.owners = {}
+
+    def claim(self, name: str, owner: str, ttl_seconds: float) -> bool:
+        return self.owners.setdefault(name, owner) == owner
+
+
+def test_claim_worker_id_unique():
+    leases = FakeLeases()
+    workers = [claim_worker_id(leases.claim, f"owner-{i}", 5) for i in range(3)]
+    assert workers == [5, 6, 7]
+
+
+def test_claim_worker_id_renews_own_lease():
+    leases = FakeLeases()
+    assert claim_worker_id(leases.claim, "a", MAX_WORKER_ID) == MAX_WORKER_ID
+    assert claim_worker_id(leases.claim, "b", MAX_WORKER_ID) == 0
+    assert claim_worker_id(leases.claim, "a", MAX_WORKER_ID) == MAX_WORKER_ID
+
+
+def test_claim_worker_id_exhausted():
+    def never(name, owner, ttl_seconds):
+        return False
+
+    with pytest.raises(RuntimeError):
+        claim_worker_id(never, "a")
@@ -0,0 +1,109 @@
+"""Tests for the warm challenge pool."""
+
+import itertools
+import threading
+import time
+
+import pytest
+
+from domain import challenge_pool
+from domain.challenge_pool import ChallengePool
+
+
+class FakeGenerator:
+    """Generate function recording its calls."""
+
+    def __init__(self):
+        self.calls = []
+        self._ids = itertools.count(1)
+
+    def __call__(self, difficulty, count, exclude):
+        self.calls.append((difficulty, count, list(exclude)))
+        return [
+            {"id": i, "word": f"word{i}", "difficulty": difficulty}
+            for i in itertools.islice(self._ids, count)
+        ]
+
+
+@pytest.fixture
+def cached_ids(monkeypatch):
+    """IDs of challenges still in the cache; every generated one by default."""
+    expired = set()
+    monkeypatch.setattr(
+        challenge_pool,
+        "get_cached_challenge",
+        lambda challenge_id: None if challenge_id in expired else {"id": challenge_id},
+    )
+    return expired
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_pop_empty_pool(cached_ids):
+    pool = ChallengePool(FakeGenerator(), target_size=4, low_watermark=1)
+    assert pool.pop("easy") is None
+    assert pool.pop("unknown") is None
+
+
+def test_pop_skips_expired_candidates(cached_ids):
+    pool = ChallengePool(FakeGenerator(), target_size=4, low_watermark=1)
+    pool._queues["easy"].extend({"id": i, "word": f"w{i}"} for i in (1, 2, 3))
+    cached_ids.update({1, 2})
+
+    assert pool.pop("easy")["id"] == 3
+    assert pool.pop("easy") is None
+
+
+def test_pop_validates_without_lock(monkeypatch):
+    pool = ChallengePool(FakeGenerator(), target_size=4, low_watermark=1)
+    pool._queues["easy"].append({"id": 1, "word": "w1"})
+    lock_free = []
+
+    def try_lock():
+        acquired = pool._condition.acquire(timeout=1)
+        lock_free.append(acquired)
+        if acquired:
+            pool._condition.release()
+
+    def get_cached_challenge(challenge_id):
+        # Another thread (the producer, another pop) must get the lock
+        other = threading.Thread(target=try_lock)
+        other.start()
+        other.join()
+        return {"id": challenge_id}
+
+    monkeypatch.setattr(challenge_pool, "get_cached_challenge", get_cached_challenge)
+    assert pool.pop("easy")["id"] == 1
+    assert lock_free == [True]
+
+
+def test_refill_at_low_watermark(cached_ids):
+    generate = FakeGenerator()
+    pool = ChallengePool(
+        generate, target_size=4, low_watermark=1, difficulties=("easy",)
+    )
+    pool.start()
+    try:
+        _wait_for(lambda: pool.sizes() == {"easy": 4})
+        calls = len(generate.calls)
+
+        # Above the watermark: nothing is generated
+        pool.pop("easy")
+        pool.pop("easy")
+        time.sleep(0.05)
+        assert len(generate.calls) == calls
+        assert pool.sizes() == {"easy": 2}
+
+        # At the watermark: topped back up, avoiding the words still pooled
+        pool.pop("easy")
+        _wait_for(lambda: pool.sizes() == {"easy": 4})
+        difficulty, count, exclude = generate.calls[-1]
+        assert (difficulty, count) == ("easy", 3)
+        assert exclude == ["word4"]
+    finally:
+        pool.stop()
@@ -0,0 +1,72 @@
+"""Tests for signing and verifying challenge tokens."""
+
+import pytest
+
+from infrastructure import challenge_tokens
+from infrastructure.challenge_tokens import (
+    issue_challenge_token,
+    tokens_enabled,
+    verify_challenge_token,
+)
+
+
+@pytest.fixture(autouse=True)
+def secret(monkeypatch):
+    monkeypatch.setenv("CHALLENGE_TOKEN_SECRET", "test-secret")
+
+
+def _token() -> str:
+    return issue_challenge_token(42, "easy", "B", "cat")
+
+
+def test_round_trip():
+    claims = verify_challenge_token(_token())
+    assert claims["id"] == 42
+    assert claims["difficulty"] == "easy"
+    assert claims["correct_answer"] == "B"
+    assert claims["word"] == "cat"
+
+
+def test_tokens_disabled(monkeypatch):
+    token = _token()
+    monkeypatch.delenv("CHALLENGE_TOKEN_SECRET")
+    assert not tokens_enabled()
+    assert issue_challenge_token(42, "easy", "B", "cat") is None
+    assert verify_challenge_token(token) is None
+
+
+def test_forged_signature():
+    payload, _, signature = _token().partition(".")
+    forged = signature[:-1] + ("A" if signature[-1] != "A" else "B")
+    assert verify_challenge_token(f"{payload}.{forged}") is None
+
+
+def test_signed_with_other_secret(monkeypatch):
+    token = _token()
+    monkeypatch.setenv("CHALLENGE_TOKEN_SECRET", "other-secret")
+    assert verify_challenge_token(token) is None
+
+
+def test_tampered_payload():
+    token = _token()
+    _, _, signature = token.partition(".")
+    other_payload, _, _ = issue_challenge_token(42, "easy", "A", "cat").partition(".")
+    assert verify_challenge_token(f"{other_payload}.{signature}") is None
+
+
+def test_expired(monkeypatch):
+    monkeypatch.setattr(challenge_tokens, "CHALLENGE_TOKEN_TTL_SECONDS", -1)
+    assert verify_challenge_token(_token()) is None
+
+
+@pytest.mark.parametrize(
+    "token",
+    ["", ".", "no-signature", "bm90LWpzb24.x", "é", "abc.déf", "é.é"],
+)
+def test_malformed(token):
+    assert verify_challenge_token(token) is None
+
+
+def test_non_ascii_signature():
+    payload, _, signature = _token().partition(".")
+    assert verify_challenge_token(f"{payload}.{signature[:-1]}é") is None
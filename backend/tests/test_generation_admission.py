@@ -0,0 +1,69 @@
+"""Tests for admission control of challenge generation."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from api import audio_challenge_service
+from api.audio_challenge_service import run_generation
+
+
+def _in_flight() -> int:
+    return audio_challenge_service._generations_in_flight
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def limit_one(monkeypatch):
+    monkeypatch.setattr(audio_challenge_service, "GENERATION_QUEUE_LIMIT", 1)
+
+
+def test_returns_result(limit_one):
+    assert asyncio.run(run_generation(lambda a, b: a + b, 2, 3)) == 5
+    assert _in_flight() == 0
+
+
+def test_releases_slot_on_error(limit_one):
+    def fail():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        asyncio.run(run_generation(fail))
+    assert _in_flight() == 0
+
+
+def test_cancelled_request_keeps_slot_until_job_ends(limit_one):
+    started = threading.Event()
+    release = threading.Event()
+
+    def job():
+        started.set()
+        release.wait(5)
+
+    async def scenario():
+        task = asyncio.create_task(run_generation(job))
+        await asyncio.to_thread(started.wait, 5)
+        # The client goes away while its job is still running
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert _in_flight() == 1
+        with pytest.raises(HTTPException) as rejected:
+            await run_generation(job)
+        assert rejected.value.status_code == 503
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        release.set()
+    _wait_for(lambda: _in_flight() == 0)
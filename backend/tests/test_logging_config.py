@@ -0,0 +1,44 @@
+"""Tests for logging configuration."""
+
+import logging
+
+import pytest
+
+from infrastructure.logging_config import configure_logging, parse_levels, stop_logging
+
+
+@pytest.fixture
+def configure(monkeypatch):
+    root = logging.getLogger()
+    saved = (root.handlers[:], root.level)
+    names = ("httpx", "httpcore", "api")
+    saved_levels = {name: logging.getLogger(name).level for name in names}
+
+    def configure_with(log_levels: str) -> None:
+        monkeypatch.setenv("LOG_LEVELS", log_levels)
+        configure_logging()
+
+    yield configure_with
+
+    stop_logging()
+    root.handlers, root.level = saved
+    for name, level in saved_levels.items():
+        logging.getLogger(name).setLevel(level)
+
+
+def test_parse_levels():
+    assert parse_levels("a=debug, b.c=WARNING,,bad") == {"a": "DEBUG", "b.c": "WARNING"}
+    assert parse_levels("") == {}
+
+
+def test_http_client_loggers_quiet_by_default(configure):
+    configure("api=ERROR")
+    assert logging.getLogger("httpx").level == logging.WARNING
+    assert logging.getLogger("httpcore").level == logging.WARNING
+    assert logging.getLogger("api").level == logging.ERROR
+
+
+def test_http_client_loggers_overridable(configure):
+    configure("httpx=DEBUG")
+    assert logging.getLogger("httpx").level == logging.DEBUG
+    assert logging.getLogger("httpcore").level == logging.WARNING
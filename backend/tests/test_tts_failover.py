@@ -0,0 +1,76 @@
+"""Tests for TTS failover and how its clips are cached."""
+
+import uuid
+
+import pytest
+
+from domain import audio_challenge_logic
+from domain.audio_challenge_logic import synthesize_variant
+from infrastructure.audio_cache import get_synthesized_audio, synthesis_key
+from infrastructure.tts_backends import (
+    FailoverTTSBackend,
+    StubTTSBackend,
+    TTSBackend,
+    set_tts_backend,
+)
+
+
+class FlakyBackend(TTSBackend):
+    """Primary engine that fails until told to recover."""
+
+    name = "flaky"
+
+    def __init__(self):
+        self.failing = True
+        self.calls = 0
+
+    def synthesize(self, text: str, lang: str = "en", slow: bool = False) -> bytes:
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError("primary engine timed out")
+        return b"ID3primary:" + text.encode("utf-8")
+
+
+@pytest.fixture
+def failover(monkeypatch):
+    primary = FlakyBackend()
+    backend = FailoverTTSBackend(primary, StubTTSBackend())
+    set_tts_backend(backend)
+    # Keep clips as synthesized, whether or not ffmpeg is installed
+    monkeypatch.setattr(audio_challenge_logic, "process_audio", lambda audio: {})
+    yield primary
+    set_tts_backend(None)
+
+
+def test_reports_engine():
+    primary = FlakyBackend()
+    backend = FailoverTTSBackend(primary, StubTTSBackend())
+    assert backend.preferred_engine == "flaky"
+
+    audio, engine = backend.synthesize_with_engine("cat")
+    assert engine == "stub"
+    assert audio == StubTTSBackend().synthesize("cat")
+
+    primary.failing = False
+    assert backend.synthesize_with_engine("cat") == (b"ID3primary:cat", "flaky")
+
+
+def test_fallback_clip_not_cached_for_primary(failover):
+    text = f"word-{uuid.uuid4().hex}"
+    variant = {"spoken_text": text, "pattern": "correct"}
+    primary_key = synthesis_key(text, "en", False, "flaky")
+
+    # Primary down: the fallback clip is served but stored under its own key
+    fallback_key = synthesize_variant(variant)
+    assert fallback_key == synthesis_key(text, "en", False, "stub")
+    assert get_synthesized_audio(fallback_key).startswith(b"ID3")
+    assert get_synthesized_audio(primary_key) is None
+
+    # Primary back: the next request uses it instead of the degraded clip
+    failover.failing = False
+    assert synthesize_variant(variant) == primary_key
+    assert get_synthesized_audio(primary_key) == b"ID3primary:" + text.encode()
+
+    calls = failover.calls
+    assert synthesize_variant(variant) == primary_key
+    assert failover.calls == calls